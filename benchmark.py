@@ -0,0 +1,173 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import timeit
+import tracemalloc
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+from lexer import lexer
+from parser import parser
+from pipeline import ERRORS, solve_many
+from solver import solver
+
+# Corpus padrão de cada medição; cada eixo (tamanho, profundidade e densidade de
+# frações) varia sozinho a partir dele
+SIZE = 1000
+DEPTH = 4
+FRACTIONS = 0.25
+
+SIZES = (100, 1000, 10000)
+DEPTHS = (1, 4, 8)
+FRACTION_DENSITIES = (0.0, 0.25, 0.5)
+
+# Incrementar quando o formato do JSON mudar
+FORMAT_VERSION = 1
+
+
+def long_equation(terms: int) -> str:
+    return " + ".join(f"{i}x - ({i} * 2 / 3)" for i in range(terms)) + " = 1"
+
+
+def best_of(func: Callable[[], object], number: int = 5, repeat: int = 5) -> float:
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def bench_parser(sizes: Iterable[int] = (100, 1000, 10000)) -> Dict[int, float]:
+    results: Dict[int, float] = {}
+    for size in sizes:
+        tokens = lexer(long_equation(size))
+        results[size] = best_of(lambda: parser(tokens))
+    return results
+
+
+def small_equation(i: int) -> str:
+    return f"{i % 97 + 1}x + {i % 13} = ({i % 31} - x) / 3"
+
+
+def bench_memory(count: int = 100_000) -> int:
+    # Bytes still allocated after parsing `count` equations and keeping the trees
+    texts = [small_equation(i) for i in range(count)]
+    tracemalloc.start()
+    try:
+        trees = [parser(lexer(text)) for text in texts]
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del trees
+    return size
+
+
+def random_expression(rng: random.Random, depth: int, fractions: float) -> str:
+    # Expressão linear em x com até `depth` níveis de parênteses; `fractions` é a
+    # chance de cada nível ser uma divisão (sempre por um literal não nulo)
+    if depth == 0 or rng.random() < 0.2:
+        kind = rng.random()
+        if kind < 0.4:
+            return str(rng.randint(0, 20))
+        if kind < 0.8:
+            return f"{rng.randint(1, 9)}x"
+        return "x"
+
+    if rng.random() < fractions:
+        return f"({random_expression(rng, depth - 1, fractions)}) / {rng.randint(1, 9)}"
+
+    op = rng.choice("+-*")
+    if op == "*":
+        return f"{rng.randint(1, 9)} * ({random_expression(rng, depth - 1, fractions)})"
+    left = random_expression(rng, depth - 1, fractions)
+    right = random_expression(rng, depth - 1, fractions)
+    return f"({left} {op} {right})"
+
+
+def corpus(size: int, depth: int = DEPTH, fractions: float = FRACTIONS, seed: int = 0) -> List[str]:
+    # Mesmos parâmetros, mesmo corpus, em qualquer máquina e versão do Python
+    rng = random.Random(f"{seed}-{size}-{depth}-{fractions}")
+    return [
+        f"{random_expression(rng, depth, fractions)} = {random_expression(rng, depth, fractions)}"
+        for _ in range(size)
+    ]
+
+
+def solve_trees(trees: Iterable[object]) -> None:
+    for tree in trees:
+        try:
+            solver(tree)  # type: ignore
+        except ERRORS:
+            pass
+
+
+def bench_stages(texts: Sequence[str], repeat: int = 3) -> Dict[str, float]:
+    # Cada estágio mede só o próprio trabalho: recebe a saída já pronta do anterior
+    tokens = [lexer(text) for text in texts]
+    trees = [parser(t) for t in tokens]
+
+    stages: Dict[str, Callable[[], object]] = {
+        "lexer": lambda: [lexer(text) for text in texts],
+        "parser": lambda: [parser(t) for t in tokens],
+        "solver": lambda: solve_trees(trees),
+        "str": lambda: [str(tree) for tree in trees],
+        "end_to_end": lambda: solve_many(texts),
+    }
+    return {name: best_of(func, number=1, repeat=repeat) for name, func in stages.items()}
+
+
+def bench_suite(
+    sizes: Iterable[int] = SIZES,
+    depths: Iterable[int] = DEPTHS,
+    fraction_densities: Iterable[float] = FRACTION_DENSITIES,
+    repeat: int = 3,
+    seed: int = 0,
+) -> List[Dict[str, object]]:
+    configs = [(size, DEPTH, FRACTIONS) for size in sizes]
+    configs += [(SIZE, depth, FRACTIONS) for depth in depths]
+    configs += [(SIZE, DEPTH, fractions) for fractions in fraction_densities]
+
+    results: List[Dict[str, object]] = []
+    for size, depth, fractions in dict.fromkeys(configs):
+        texts = corpus(size, depth, fractions, seed)
+        for stage, seconds in bench_stages(texts, repeat).items():
+            results.append({
+                "size": size,
+                "depth": depth,
+                "fractions": fractions,
+                "stage": stage,
+                "seconds": seconds,
+                "per_equation": seconds / size,
+            })
+    return results
+
+
+def report(quick: bool = False, repeat: int = 3, seed: int = 0) -> Dict[str, object]:
+    sizes = SIZES[:2] if quick else SIZES
+    return {
+        "version": FORMAT_VERSION,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "seed": seed,
+        "repeat": repeat,
+        "stages": bench_suite(sizes, repeat=repeat, seed=seed),
+        "parser_long_equation": {str(size): seconds for size, seconds in bench_parser(sizes).items()},
+        "memory_bytes": bench_memory(10_000 if quick else 100_000),
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    arguments = argparse.ArgumentParser(description="Benchmark lexer, parser and solver; prints JSON")
+    arguments.add_argument("-o", "--output", help="write the JSON report to this file instead of stdout")
+    arguments.add_argument("--quick", action="store_true", help="smaller corpora, for a fast sanity run")
+    arguments.add_argument("--repeat", type=int, default=3, help="timings per measurement, best one is kept")
+    arguments.add_argument("--seed", type=int, default=0, help="seed of the generated corpora")
+    args = arguments.parse_args(argv)
+
+    result = json.dumps(report(args.quick, args.repeat, args.seed), indent=2)
+    if args.output is None:
+        print(result)
+    else:
+        with open(args.output, "w") as file:
+            file.write(result + "\n")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
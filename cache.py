@@ -0,0 +1,234 @@
+import sqlite3
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+import codec
+import solver
+from cache_info import CacheInfo
+from lexer import normalize
+from nodes import Root
+from pipeline import ERRORS, Result, solve
+
+
+class SolveCache:
+    # Cache LRU na frente de lexer -> parser -> solver, indexado pelo texto
+    # normalizado, então "2x = 10" e "2x=10" compartilham a mesma entrada
+
+    def __init__(self, maxsize: int = 4096):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Union[Root, Exception]]" = OrderedDict()
+
+    def solve(self, text: str) -> Root:
+        key = normalize(text)
+        entries = self._entries
+        entry = entries.get(key)
+
+        if entry is not None:
+            self.hits += 1
+            entries.move_to_end(key)
+        else:
+            self.misses += 1
+            try:
+                entry = solve(key)
+            except ERRORS as e:
+                entry = e
+            entries[key] = entry
+            if len(entries) > self.maxsize:
+                entries.popitem(last=False)
+                self.evictions += 1
+
+        if isinstance(entry, Exception):
+            raise type(entry)(*entry.args)
+
+        # Os nós são imutáveis, então a mesma entrada pode ser entregue a todos
+        return entry
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, self.evictions, len(self._entries), self.maxsize)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, text: str) -> bool:
+        return normalize(text) in self._entries
+
+
+# Cache persistente em SQLite, compartilhado entre processos e execuções.
+# As respostas vão codificadas com codec.encode; erros vão como tipo e mensagem.
+# A versão gravada junto do banco combina o esquema da tabela, o formato do codec
+# e solver.VERSION: se qualquer um mudar, as entradas antigas são descartadas
+SCHEMA = 1
+DISK_VERSION = f"{SCHEMA}.{codec.VERSION}.{solver.VERSION}"
+
+# Só erros destes tipos são guardados (e recriados a partir do nome)
+_ERROR_TYPES = {
+    cls.__name__: cls
+    for cls in (ValueError, ArithmeticError, ZeroDivisionError, OverflowError)
+}
+
+# Entrada ainda não gravada: (raiz codificada ou None, tipo do erro, mensagem)
+Row = Tuple[Optional[bytes], Optional[str], Optional[str]]
+
+
+class DiskCache:
+    # Mesma interface de SolveCache. Entradas novas e os acessos (para o LRU) são
+    # acumulados e gravados de `batch` em `batch` numa única transação, e a
+    # remoção das entradas menos usadas acontece nessa gravação. Cada processo
+    # abre a sua conexão: ela não pode ser compartilhada nem atravessar um fork
+
+    def __init__(self, path: str, maxsize: int = 1 << 20, batch: int = 1024, timeout: float = 30.0):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        if batch < 1:
+            raise ValueError("batch must be at least 1")
+        self.path = path
+        self.maxsize = maxsize
+        self.batch = batch
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._pending: Dict[str, Row] = {}
+        self._touched: Dict[str, float] = {}
+
+        # isolation_level=None: as transações são abertas explicitamente, e com
+        # BEGIN IMMEDIATE um escritor espera (até timeout) em vez de falhar no meio
+        self._db = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        with self._transaction():
+            self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            row = self._db.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+            if row is None or row[0] != DISK_VERSION:
+                self._db.execute("DROP TABLE IF EXISTS entries")
+                self._db.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (DISK_VERSION,))
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, root BLOB, error TEXT, message TEXT, used REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS entries_used ON entries (used)")
+
+    def solve(self, text: str) -> Root:
+        key = normalize(text)
+        row = self._pending.get(key)
+        if row is None:
+            row = self._db.execute("SELECT root, error, message FROM entries WHERE key = ?", (key,)).fetchone()
+
+        if row is not None:
+            self.hits += 1
+            self._touched[key] = time.time()
+            root, error, message = row
+        else:
+            self.misses += 1
+            try:
+                result: Result = solve(key)
+            except ERRORS as e:
+                result = e
+            if isinstance(result, Exception):
+                root, error, message = None, type(result).__name__, str(result)
+                if error not in _ERROR_TYPES:
+                    raise result
+            else:
+                root, error, message = codec.encode(result), None, None
+            self._pending[key] = (root, error, message)
+
+        if len(self._pending) + len(self._touched) >= self.batch:
+            self.flush()
+
+        if error is not None:
+            raise _ERROR_TYPES[error](message)
+        node, _ = codec.decode(root)  # type: ignore
+        return node  # type: ignore
+
+    def flush(self) -> None:
+        if not self._pending and not self._touched:
+            return
+
+        now = time.time()
+        db = self._db
+        with self._transaction():
+            db.executemany(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                [(key, root, error, message, now) for key, (root, error, message) in self._pending.items()],
+            )
+            db.executemany("UPDATE entries SET used = ? WHERE key = ?", [(used, key) for key, used in self._touched.items()])
+            excess = db.execute("SELECT COUNT(*) FROM entries").fetchone()[0] - self.maxsize
+            if excess > 0:
+                db.execute(
+                    "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY used LIMIT ?)",
+                    (excess,),
+                )
+                self.evictions += excess
+
+        self._pending.clear()
+        self._touched.clear()
+
+    def info(self) -> CacheInfo:
+        self.flush()
+        return CacheInfo(self.hits, self.misses, self.evictions, len(self), self.maxsize)
+
+    def clear(self) -> None:
+        self._pending.clear()
+        self._touched.clear()
+        with self._transaction():
+            self._db.execute("DELETE FROM entries")
+        self.hits = self.misses = self.evictions = 0
+
+    def close(self) -> None:
+        self.flush()
+        self._db.close()
+
+    def __enter__(self) -> "DiskCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        self.flush()
+        return self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def __contains__(self, text: str) -> bool:
+        key = normalize(text)
+        if key in self._pending:
+            return True
+        return self._db.execute("SELECT 1 FROM entries WHERE key = ?", (key,)).fetchone() is not None
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+
+# Uma DiskCache por caminho em cada processo worker, aberta no primeiro lote
+_open: Dict[str, DiskCache] = {}
+
+
+def solve_many_cached(path: str, texts: Iterable[str]) -> List[Result]:
+    # Para os workers de pipeline: o lote é gravado ao final, então os outros
+    # processos já enxergam as respostas novas
+    cache = _open.get(path)
+    if cache is None:
+        cache = _open[path] = DiskCache(path)
+    results: List[Result] = []
+    for text in texts:
+        try:
+            results.append(cache.solve(text))
+        except ERRORS as e:
+            results.append(e)
+    cache.flush()
+    return results
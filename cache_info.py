@@ -0,0 +1,14 @@
+from dataclasses import dataclass
+
+
+# Estatísticas dos caches LRU (cache.SolveCache, cache.DiskCache, compiler.Compiler).
+# Fica num módulo sem dependências para que importá-lo não carregue o pipeline
+
+
+@dataclass(frozen=True)
+class CacheInfo:
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    maxsize: int
@@ -0,0 +1,155 @@
+import re
+import pytest
+from dataclasses import FrozenInstanceError
+from fractions import Fraction
+import cache as cache_module
+from cache import CacheInfo, DiskCache, SolveCache
+from nodes import Root, Literal, Variable
+from pipeline import solve_many, solve_stream
+
+
+def test_cache_hits_on_whitespace_variants() -> None:
+    cache = SolveCache()
+    assert cache.solve("2x = 10") == Root(Variable("x"), Literal(5))
+    assert cache.solve("2x=10") == Root(Variable("x"), Literal(5))
+    assert cache.solve("  2x\t=\n10 ") == Root(Variable("x"), Literal(5))
+    assert cache.info() == CacheInfo(hits=2, misses=1, evictions=0, size=1, maxsize=4096)
+    assert "2x =10" in cache
+
+
+def test_cache_keeps_significant_whitespace() -> None:
+    cache = SolveCache()
+    assert cache.solve("23 = x") == Root(Variable("x"), Literal(23))
+    with pytest.raises(ValueError):
+        cache.solve("2 3 = x")
+    assert cache.info().misses == 2
+
+
+def test_cache_lru_eviction() -> None:
+    cache = SolveCache(maxsize=2)
+    cache.solve("x = 1")
+    cache.solve("x = 2")
+    cache.solve("x = 1")
+    cache.solve("x = 3")
+
+    assert "x = 1" in cache
+    assert "x = 2" not in cache
+    assert "x = 3" in cache
+    assert cache.info() == CacheInfo(hits=1, misses=3, evictions=1, size=2, maxsize=2)
+
+
+def test_cache_results_are_immutable() -> None:
+    cache = SolveCache()
+    first = cache.solve("2x = 10")
+    with pytest.raises(FrozenInstanceError):
+        first.left = Variable("y")  # type: ignore
+    assert cache.solve("2x = 10") is first
+
+
+def test_cache_errors() -> None:
+    cache = SolveCache()
+    for _ in range(2):
+        with pytest.raises(ValueError, match=re.escape("Invalid character: @")):
+            cache.solve("x @ 3 = 7")
+    assert cache.info().hits == 1
+
+
+def test_cache_clear() -> None:
+    cache = SolveCache()
+    cache.solve("x = 1")
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.info() == CacheInfo(0, 0, 0, 0, 4096)
+
+
+def test_cache_invalid_maxsize() -> None:
+    with pytest.raises(ValueError, match="maxsize"):
+        SolveCache(0)
+
+
+def test_solve_many_with_cache() -> None:
+    cache = SolveCache()
+    results = solve_many(["2x = 10", "2x=10", "x $ 1 = 2"], cache=cache)
+    assert results[:2] == [Root(Variable("x"), Literal(5))] * 2
+    assert isinstance(results[2], ValueError)
+    assert cache.info().hits == 1
+
+
+def test_disk_cache_persists_across_instances(tmp_path) -> None:
+    path = str(tmp_path / "answers.db")
+    with DiskCache(path) as cache:
+        assert cache.solve("2x = 10") == Root(Variable("x"), Literal(5))
+        assert cache.solve("2x=10") == Root(Variable("x"), Literal(5))
+        assert cache.info() == CacheInfo(hits=1, misses=1, evictions=0, size=1, maxsize=1 << 20)
+
+    with DiskCache(path) as cache:
+        result = cache.solve("2x = 10")
+        assert result == Root(Variable("x"), Literal(5))
+        assert type(result.right.value) is Fraction  # type: ignore
+        assert cache.info().hits == 1 and cache.info().misses == 0
+
+
+def test_disk_cache_errors(tmp_path) -> None:
+    path = str(tmp_path / "answers.db")
+    for hits in (0, 1):
+        with DiskCache(path) as cache:
+            with pytest.raises(ZeroDivisionError, match="division by zero"):
+                cache.solve("x / 0 = 1")
+            with pytest.raises(ValueError, match=re.escape("Invalid character: @")):
+                cache.solve("x @ 3 = 7")
+            assert cache.info().hits == 2 * hits
+
+
+def test_disk_cache_lru_eviction(tmp_path) -> None:
+    cache = DiskCache(str(tmp_path / "answers.db"), maxsize=2, batch=1)
+    cache.solve("x = 1")
+    cache.solve("x = 2")
+    cache.solve("x = 1")
+    cache.solve("x = 3")
+
+    assert "x = 1" in cache
+    assert "x = 2" not in cache
+    assert "x = 3" in cache
+    assert cache.info() == CacheInfo(hits=1, misses=3, evictions=1, size=2, maxsize=2)
+    cache.close()
+
+
+def test_disk_cache_version_change_invalidates(tmp_path, monkeypatch) -> None:
+    path = str(tmp_path / "answers.db")
+    with DiskCache(path) as cache:
+        cache.solve("x = 1")
+
+    with DiskCache(path) as cache:
+        assert "x = 1" in cache
+
+    monkeypatch.setattr(cache_module, "DISK_VERSION", "changed")
+    with DiskCache(path) as cache:
+        assert len(cache) == 0
+
+
+def test_disk_cache_clear(tmp_path) -> None:
+    with DiskCache(str(tmp_path / "answers.db")) as cache:
+        cache.solve("x = 1")
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.info() == CacheInfo(0, 0, 0, 0, 1 << 20)
+
+
+@pytest.mark.parametrize("maxsize, batch", [(0, 1), (1, 0)])
+def test_disk_cache_invalid_arguments(tmp_path, maxsize: int, batch: int) -> None:
+    with pytest.raises(ValueError, match="must be at least 1"):
+        DiskCache(str(tmp_path / "answers.db"), maxsize, batch)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_solve_stream_with_disk_cache(tmp_path, workers: int) -> None:
+    path = str(tmp_path / "answers.db")
+    texts = [f"{i % 5}x = {i}" for i in range(40)]
+    expected = solve_many(texts)
+
+    for _ in range(2):
+        results = list(solve_stream(texts, workers=workers, chunksize=7, cache_path=path))
+        assert [str(r) for r in results] == [str(r) for r in expected]
+
+    with DiskCache(path) as cache:
+        assert len(cache) == 40
@@ -0,0 +1,264 @@
+import struct
+from fractions import Fraction
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Tuple
+from nodes import Node, Root, Literal, Variable, BinaryOp
+
+
+# Codificação binária compacta das árvores de nodes.py.
+#
+#   arquivo  = MAGIC VERSION registro*
+#   registro = varint(tamanho) varint(#nomes) (varint(len) utf-8)* opcode...
+#
+# Os opcodes vêm em pré-ordem; cada folha traz seus números logo depois do opcode.
+# Inteiros com sinal usam zigzag + varint (LEB128), então números pequenos ocupam
+# um byte; variáveis apontam para a tabela de nomes do registro
+
+MAGIC = b"EQB"
+VERSION = 1
+
+ROOT = 0
+ADD = 1
+SUB = 2
+MUL = 3
+DIV = 4
+INTEGER = 5              # Literal int: valor
+FRACTION = 6             # Literal Fraction: numerador, denominador
+FLOAT = 7                # Literal float: 8 bytes IEEE 754
+VARIABLE = 8             # Variable com coef 1: nome
+VARIABLE_INTEGER = 9     # Variable com coef int: nome, coef
+VARIABLE_FRACTION = 10   # Variable com coef Fraction: nome, numerador, denominador
+
+_OPCODES = {"+": ADD, "-": SUB, "*": MUL, "/": DIV}
+_OPERATORS = {code: op for op, code in _OPCODES.items()}
+_HEADER = MAGIC + bytes([VERSION])
+_DOUBLE = struct.Struct("<d")
+
+
+def dumps(node: Node) -> bytes:
+    return _HEADER + encode(node)
+
+
+def loads(data: bytes) -> Node:
+    _check_header(bytes(data[:len(_HEADER)]))
+    node, end = decode(data, len(_HEADER))
+    if end != len(data):
+        raise ValueError("Trailing data after record")
+    return node
+
+
+def dump_stream(nodes: Iterable[Node], file: BinaryIO) -> int:
+    file.write(_HEADER)
+    count = 0
+    for node in nodes:
+        file.write(encode(node))
+        count += 1
+    return count
+
+
+def load_stream(file: BinaryIO, chunk_size: int = 1 << 16) -> Iterator[Node]:
+    # Lê o arquivo em blocos; um registro que atravessa o fim do bloco espera o próximo
+    _check_header(file.read(len(_HEADER)))
+    buffer = b""
+    position = 0
+
+    while True:
+        chunk = file.read(chunk_size)
+        if chunk:
+            buffer = buffer[position:] + chunk
+            position = 0
+        elif position == len(buffer):
+            return
+
+        while position < len(buffer):
+            try:
+                size, start = _read_varint(buffer, position)
+            except IndexError:
+                break
+            if start + size > len(buffer):
+                break
+            node, end = _decode_body(buffer, start, start + size)
+            position = end
+            yield node
+
+        if not chunk:
+            raise ValueError("Truncated record")
+
+
+def encode(node: Node) -> bytes:
+    # Um registro: tamanho seguido do corpo (tabela de nomes + opcodes)
+    names: Dict[str, int] = {}
+    ops = bytearray()
+    stack: List[Node] = [node]
+
+    while stack:
+        node = stack.pop()
+
+        if isinstance(node, BinaryOp):
+            ops.append(_OPCODES[node.op])
+            stack.append(node.right)
+            stack.append(node.left)
+        elif isinstance(node, Literal):
+            value = node.value
+            if type(value) is int:
+                ops.append(INTEGER)
+                _write_signed(ops, value)
+            elif isinstance(value, Fraction):
+                ops.append(FRACTION)
+                _write_signed(ops, value.numerator)
+                _write_varint(ops, value.denominator)
+            elif isinstance(value, float):
+                ops.append(FLOAT)
+                ops += _DOUBLE.pack(value)
+            else:
+                raise ValueError(f"Unsupported literal value: {value!r}")
+        elif isinstance(node, Variable):
+            index = names.get(node.name)
+            if index is None:
+                index = names[node.name] = len(names)
+            coef = node.coef
+            if type(coef) is int:
+                ops.append(VARIABLE if coef == 1 else VARIABLE_INTEGER)
+                _write_varint(ops, index)
+                if coef != 1:
+                    _write_signed(ops, coef)
+            else:
+                ops.append(VARIABLE_FRACTION)
+                _write_varint(ops, index)
+                _write_signed(ops, coef.numerator)  # type: ignore
+                _write_varint(ops, coef.denominator)  # type: ignore
+        elif isinstance(node, Root):
+            ops.append(ROOT)
+            stack.append(node.right)
+            stack.append(node.left)
+        else:
+            raise ValueError(f"Unexpected node: {node!r}")
+
+    body = bytearray()
+    _write_varint(body, len(names))
+    for name in names:
+        encoded = name.encode("utf-8")
+        _write_varint(body, len(encoded))
+        body += encoded
+    body += ops
+
+    record = bytearray()
+    _write_varint(record, len(body))
+    return bytes(record + body)
+
+
+def decode(data: bytes, position: int = 0) -> Tuple[Node, int]:
+    # Decodifica o registro que começa em `position`; devolve o nó e onde ele termina
+    try:
+        size, start = _read_varint(data, position)
+    except IndexError:
+        raise ValueError("Truncated record") from None
+    if start + size > len(data):
+        raise ValueError("Truncated record")
+    return _decode_body(data, start, start + size)
+
+
+def _decode_body(data: bytes, position: int, end: int) -> Tuple[Node, int]:
+    read_varint = _read_varint
+    items: List[object] = []
+    try:
+        count, position = read_varint(data, position)
+        names: List[str] = []
+        for _ in range(count):
+            size, position = read_varint(data, position)
+            names.append(bytes(data[position:position + size]).decode("utf-8"))
+            position += size
+
+        # Pré-ordem vira uma lista de folhas e marcadores de operador...
+        while position < end:
+            opcode = data[position]
+            position += 1
+
+            if opcode <= DIV:
+                items.append(opcode)
+            elif opcode == INTEGER:
+                value, position = read_varint(data, position)
+                items.append(Literal(_unzigzag(value)))
+            elif opcode == FRACTION:
+                numerator, position = read_varint(data, position)
+                denominator, position = read_varint(data, position)
+                items.append(Literal(Fraction(_unzigzag(numerator), denominator)))
+            elif opcode == FLOAT:
+                items.append(Literal(_DOUBLE.unpack_from(data, position)[0]))
+                position += _DOUBLE.size
+            elif opcode == VARIABLE:
+                index, position = read_varint(data, position)
+                items.append(Variable(names[index]))
+            elif opcode == VARIABLE_INTEGER:
+                index, position = read_varint(data, position)
+                coef, position = read_varint(data, position)
+                items.append(Variable(names[index], _unzigzag(coef)))
+            elif opcode == VARIABLE_FRACTION:
+                index, position = read_varint(data, position)
+                numerator, position = read_varint(data, position)
+                denominator, position = read_varint(data, position)
+                items.append(Variable(names[index], Fraction(_unzigzag(numerator), denominator)))
+            else:
+                raise ValueError(f"Unknown opcode: {opcode}")
+    except (IndexError, struct.error):
+        raise ValueError("Truncated record") from None
+
+    if position != end:
+        raise ValueError("Truncated record")
+
+    # ... que, lida de trás para frente, tem os dois operandos de cada operador
+    # no topo da pilha, o da esquerda primeiro
+    stack: List[Node] = []
+    for item in reversed(items):
+        if type(item) is int:
+            if len(stack) < 2:
+                raise ValueError("Malformed record")
+            left = stack.pop()
+            right = stack.pop()
+            if item == ROOT:
+                stack.append(Root(left, right))
+            else:
+                stack.append(BinaryOp(_OPERATORS[item], left, right))  # type: ignore
+        else:
+            stack.append(item)  # type: ignore
+
+    if len(stack) != 1:
+        raise ValueError("Malformed record")
+    return stack[0], end
+
+
+def _check_header(header: bytes) -> None:
+    if header[:len(MAGIC)] != MAGIC or len(header) != len(_HEADER):
+        raise ValueError("Invalid header")
+    if header[len(MAGIC)] != VERSION:
+        raise ValueError(f"Unsupported version: {header[len(MAGIC)]}")
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _write_signed(out: bytearray, value: int) -> None:
+    _write_varint(out, value << 1 if value >= 0 else ((-value) << 1) - 1)
+
+
+def _read_varint(data: bytes, position: int) -> Tuple[int, int]:
+    byte = data[position]
+    if byte < 0x80:
+        return byte, position + 1
+
+    value = byte & 0x7F
+    shift = 7
+    while True:
+        position += 1
+        byte = data[position]
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, position + 1
+        shift += 7
+
+
+def _unzigzag(value: int) -> int:
+    return value >> 1 if not value & 1 else -((value + 1) >> 1)
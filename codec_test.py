@@ -0,0 +1,86 @@
+import io
+import pickle
+import pytest
+from fractions import Fraction
+from codec import MAGIC, decode, dump_stream, dumps, encode, load_stream, loads
+from lexer import lexer
+from nodes import Node, Root, Literal, Variable, BinaryOp
+from parser import parser
+from pipeline import solve
+
+NODES = [
+    parser(lexer("2x + 3 = 7")),
+    parser(lexer("(x - 1/2) * 3.25 = -(y / 4) + 1000000")),
+    solve("3x = 1"),
+    Root(Variable("é", Fraction(-7, 3)), Literal(2.5)),
+    BinaryOp("-", Literal(-(2 ** 80)), Variable("x", -1)),
+    Literal(0),
+]
+
+
+@pytest.mark.parametrize("node", NODES)
+def test_roundtrip(node: Node) -> None:
+    data = dumps(node)
+    assert data.startswith(MAGIC)
+    back = loads(data)
+    assert back == node
+    assert str(back) == str(node)
+    assert type(getattr(back, "right", back)) is type(getattr(node, "right", node))
+
+
+def test_roundtrip_keeps_number_types() -> None:
+    node = Root(BinaryOp("+", Variable("x", 2), Literal(Fraction(4))), BinaryOp("*", Literal(1.5), Literal(3)))
+    back = loads(dumps(node))
+    assert type(back.left.left.coef) is int  # type: ignore
+    assert type(back.left.right.value) is Fraction  # type: ignore
+    assert type(back.right.left.value) is float  # type: ignore
+    assert type(back.right.right.value) is int  # type: ignore
+
+
+def test_smaller_than_pickle() -> None:
+    roots = [parser(lexer(f"{i}x + {i % 7} = ({i % 13} - x) / 3")) for i in range(500)]
+    file = io.BytesIO()
+    assert dump_stream(roots, file) == 500
+    assert len(file.getvalue()) * 4 < len(pickle.dumps(roots))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 64, 1 << 16])
+def test_stream(chunk_size: int) -> None:
+    file = io.BytesIO()
+    dump_stream(NODES * 3, file)
+    file.seek(0)
+    assert list(load_stream(file, chunk_size)) == NODES * 3
+
+
+def test_stream_empty() -> None:
+    file = io.BytesIO()
+    dump_stream([], file)
+    file.seek(0)
+    assert list(load_stream(file)) == []
+
+
+def test_decode_offsets() -> None:
+    data = encode(NODES[0]) + encode(NODES[1])
+    first, end = decode(data)
+    second, end = decode(data, end)
+    assert (first, second, end) == (NODES[0], NODES[1], len(data))
+
+
+@pytest.mark.parametrize("data, error_msg", [
+    (b"XYZ\x01", "Invalid header"),
+    (MAGIC + b"\x09", "Unsupported version: 9"),
+    (dumps(NODES[0])[:-1], "Truncated record"),
+    (dumps(NODES[0]) + b"\x00", "Trailing data after record"),
+    (MAGIC + b"\x01\x02\x00\x63", "Unknown opcode: 99"),
+    (MAGIC + b"\x01\x02\x00\x01", "Malformed record"),
+])
+def test_invalid(data: bytes, error_msg: str) -> None:
+    with pytest.raises(ValueError, match=error_msg):
+        loads(data)
+
+
+def test_stream_truncated() -> None:
+    file = io.BytesIO()
+    dump_stream(NODES, file)
+    with pytest.raises(ValueError, match="Truncated record"):
+        list(load_stream(io.BytesIO(file.getvalue()[:-2]), 4))
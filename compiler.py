@@ -0,0 +1,282 @@
+from collections import OrderedDict
+from fractions import Fraction
+from typing import Callable, Dict, List, Optional, Tuple, Union
+from cache_info import CacheInfo
+from lexer import lexer
+from linear import LinearForm
+from nodes import Node, Root, Literal, Variable, BinaryOp
+from parser import parser
+from solver import move_denominators, solution
+
+
+# Equações com a mesma estrutura (mesmos operadores e variáveis nas mesmas posições)
+# só diferem nos números, então são compiladas uma única vez para uma função Python
+# gerada que recebe os números e devolve a solução, sem percorrer a árvore:
+# "5x + 1 = 2" reaproveita a função compilada para "2x + 3 = 7"
+
+_LITERAL = "#"
+_OPERATORS = {"+", "-", "*", "/", "="}
+
+# Esqueleto: folha (token, índice do número) ou (op, esquerda, direita)
+Skeleton = tuple
+# Forma linear simbólica: (const, {nome: coef}), expressões em código; None é zero
+Form = Tuple[Optional[str], Dict[str, str]]
+
+
+def structure(eq: Root) -> Tuple[str, List[Fraction]]:
+    # Pré-ordem com pilha explícita: a chave lista operadores, nomes das variáveis e
+    # "#" no lugar de cada literal; os números (valores dos literais e coeficientes
+    # das variáveis) saem da esquerda para a direita
+    tokens: List[str] = []
+    constants: List[Fraction] = []
+    stack: List[Node] = [eq]
+
+    while stack:
+        node = stack.pop()
+
+        if isinstance(node, Literal):
+            value = node.value
+            tokens.append(_LITERAL)
+            constants.append(value if type(value) is Fraction else Fraction(value))
+        elif isinstance(node, Variable):
+            coef = node.coef
+            tokens.append(node.name)
+            constants.append(coef if type(coef) is Fraction else Fraction(coef))
+        elif isinstance(node, BinaryOp):
+            tokens.append(node.op)
+            stack.append(node.right)
+            stack.append(node.left)
+        elif isinstance(node, Root):
+            tokens.append("=")
+            stack.append(node.right)
+            stack.append(node.left)
+        else:
+            raise ValueError(f"Unexpected node: {node!r}")
+
+    return " ".join(tokens), constants
+
+
+def compile_structure(key: str) -> Callable[..., Root]:
+    tokens = key.split()
+    size = index = sum(1 for token in tokens if token not in _OPERATORS)
+
+    # Prefixa lida de trás para frente: ao chegar no operador os dois operandos
+    # já estão na pilha, o da esquerda no topo
+    stack: List[Skeleton] = []
+    for token in reversed(tokens):
+        if token in _OPERATORS:
+            if len(stack) < 2:
+                raise ValueError(f"Invalid structure: {key!r}")
+            left = stack.pop()
+            right = stack.pop()
+            stack.append((token, left, right))
+        else:
+            index -= 1
+            stack.append((token, index))
+
+    if len(stack) != 1 or stack[0][0] != "=":
+        raise ValueError(f"Invalid structure: {key!r}")
+
+    _, left, right = stack[0]
+
+    # a / (bx + c) = d -> a = d(bx + c), com a mesma regra de solver.solver
+    left, right, left_factors, right_factors = move_denominators(left, right, _split)
+    for factor in left_factors:
+        left = ("*", left, factor)
+    for factor in right_factors:
+        right = ("*", right, factor)
+
+    generator = _Generator()
+    form = generator.binary("-", generator.form(left), generator.form(right))
+    denominators = [generator.form(factor) for factor in left_factors + right_factors]
+    source, namespace = generator.finish(form, denominators, size)
+
+    exec(compile(source, f"<equation {key}>", "exec"), namespace)
+    return namespace["solve"]
+
+
+class Compiler:
+    # Cache LRU das funções geradas, indexado pela estrutura da equação
+
+    def __init__(self, maxsize: int = 1024):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._functions: "OrderedDict[str, Callable[..., Root]]" = OrderedDict()
+
+    def solve(self, eq: Union[str, Root]) -> Root:
+        if isinstance(eq, str):
+            eq = parser(lexer(eq))
+        key, constants = structure(eq)
+        return self.compile(key)(*constants)
+
+    def compile(self, key: str) -> Callable[..., Root]:
+        functions = self._functions
+        function = functions.get(key)
+
+        if function is not None:
+            self.hits += 1
+            functions.move_to_end(key)
+            return function
+
+        self.misses += 1
+        function = functions[key] = compile_structure(key)
+        if len(functions) > self.maxsize:
+            functions.popitem(last=False)
+            self.evictions += 1
+        return function
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, self.evictions, len(self._functions), self.maxsize)
+
+    def clear(self) -> None:
+        self._functions.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._functions)
+
+
+def _split(node: Skeleton) -> Optional[Tuple[Skeleton, Skeleton]]:
+    if node[0] == "/" and _has_variable(node[2]):
+        return node[1], node[2]
+    return None
+
+
+def _has_variable(node: Skeleton) -> bool:
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if len(node) == 3:
+            stack.append(node[1])
+            stack.append(node[2])
+        elif node[0] != _LITERAL:
+            return True
+    return False
+
+
+class _Generator:
+    # Gera o corpo da função com a mesma semântica de linear.linear_form: cada nó
+    # vira atribuições a temporários, e o que a estrutura já decide (quais nós têm
+    # variável, quais constantes são zero) não chega a virar código
+
+    def __init__(self):
+        self.lines: List[str] = []
+        self.indent = "    "
+        self.count = 0
+
+    def emit(self, line: str) -> None:
+        self.lines.append(self.indent + line)
+
+    def assign(self, expr: str) -> str:
+        name = f"t{self.count}"
+        self.count += 1
+        self.emit(f"{name} = {expr}")
+        return name
+
+    def form(self, node: Skeleton) -> Form:
+        # Pós-ordem com pilha explícita, na mesma ordem de linear_form, então o
+        # primeiro erro encontrado é o mesmo
+        results: List[Form] = []
+        stack: List[Tuple[Skeleton, bool]] = [(node, False)]
+
+        while stack:
+            node, visited = stack.pop()
+
+            if len(node) == 2:
+                token, index = node
+                if token == _LITERAL:
+                    results.append((f"p{index}", {}))
+                else:
+                    results.append((None, {token: f"p{index}"}))
+            elif not visited:
+                stack.append((node, True))
+                stack.append((node[2], False))
+                stack.append((node[1], False))
+            else:
+                right = results.pop()
+                left = results.pop()
+                results.append(self.binary(node[0], left, right))
+
+        return results[0]
+
+    def binary(self, op: str, left: Form, right: Form) -> Form:
+        left_const, left_coefs = left
+        right_const, right_coefs = right
+
+        if op in {"+", "-"}:
+            coefs = dict(left_coefs)
+            for name, coef in right_coefs.items():
+                coefs[name] = self._add(op, coefs.get(name), coef)  # type: ignore
+            return self._add(op, left_const, right_const), coefs
+
+        if op == "*":
+            if not right_coefs:
+                return self._scale(left, right_const, "*")
+            if not left_coefs:
+                return self._scale(right, left_const, "*")
+
+            # Os dois lados têm variável na estrutura, mas o produto ainda é linear
+            # se os coeficientes de um deles forem todos zero
+            names = list(dict.fromkeys([*left_coefs, *right_coefs]))
+            const = f"t{self.count}"
+            outputs = {name: f"t{self.count + 1 + i}" for i, name in enumerate(names)}
+            self.count += 1 + len(names)
+
+            self.emit(f"if not ({' or '.join(right_coefs.values())}):")
+            self._scale_into(left, right_const, const, outputs)
+            self.emit(f"elif not ({' or '.join(left_coefs.values())}):")
+            self._scale_into(right, left_const, const, outputs)
+            self.emit("else:")
+            self.emit("    raise ValueError(\"Non-linear equation: product of variables\")")
+            return const, outputs
+
+        if right_coefs:
+            self.emit(f"if {' or '.join(right_coefs.values())}:")
+            self.emit("    raise ValueError(\"Non-linear equation: variable in a denominator\")")
+        self.emit(f"if {right_const or 0} == 0:")
+        self.emit("    raise ZeroDivisionError(\"division by zero\")")
+        return self._scale(left, right_const or "0", "/")
+
+    def _add(self, op: str, left: Optional[str], right: Optional[str]) -> Optional[str]:
+        if right is None:
+            return left
+        if left is None:
+            return right if op == "+" else self.assign(f"-{right}")
+        return self.assign(f"{left} {op} {right}")
+
+    def _scale(self, form: Form, factor: Optional[str], op: str) -> Form:
+        const, coefs = form
+        if factor is None:
+            factor = "0"
+        return (
+            None if const is None else self.assign(f"{const} {op} {factor}"),
+            {name: self.assign(f"{coef} {op} {factor}") for name, coef in coefs.items()},
+        )
+
+    def _scale_into(self, form: Form, factor: Optional[str], const: str, outputs: Dict[str, str]) -> None:
+        value, coefs = form
+        factor = factor or "0"
+        self.emit(f"    {const} = {value or 0} * {factor}")
+        for name, output in outputs.items():
+            coef = coefs.get(name)
+            self.emit(f"    {output} = {coef} * {factor}" if coef else f"    {output} = 0")
+
+    def finish(self, form: Form, denominators: List[Form], size: int) -> Tuple[str, Dict[str, object]]:
+        # left - right = 0 é resolvida por solver.solution, com os mesmos erros e a
+        # mesma verificação dos denominadores movidos de lado
+        namespace: Dict[str, object] = {"LinearForm": LinearForm, "solution": solution}
+        forms = ", ".join(self._linear_form(denominator) for denominator in denominators)
+        self.emit(f"return solution({self._linear_form(form)}, [{forms}])")
+
+        parameters = ", ".join(f"p{i}" for i in range(size))
+        source = "\n".join([f"def solve({parameters}):", *self.lines])
+        return source, namespace
+
+    def _linear_form(self, form: Form) -> str:
+        const, coefs = form
+        items = ", ".join(f"{name!r}: {coef}" for name, coef in coefs.items())
+        return f"LinearForm({{{items}}}, {const or 0})"
@@ -0,0 +1,87 @@
+import re
+import subprocess
+import sys
+import pytest
+from fractions import Fraction
+from typing import List
+from cache_info import CacheInfo
+from compiler import Compiler, compile_structure, structure
+from lexer import lexer
+from nodes import Root, Literal, Variable
+from parser import parser
+from solver import solver
+
+
+def test_structure() -> None:
+    key, constants = structure(parser(lexer("2x + 3 = 7")))
+    assert key == "= + x # #"
+    assert constants == [Fraction(2), Fraction(3), Fraction(7)]
+    assert structure(parser(lexer("5x + 1 = 2")))[0] == key
+    assert structure(parser(lexer("5y + 1 = 2")))[0] != key
+
+
+@pytest.mark.parametrize("texts", [
+    ["2x + 3 = 7", "5x + 1 = 2", "-x + 0 = 4"],
+    ["2 * (j + 3) = 4j - 2", "3 * (j + 1) = 5j - 7"],
+    ["(x - 3) / 4 = 2", "(x - 1) / 2 = 9"],
+    ["10 / (x + 1) = 2", "3 / (x + 2) = 6"],
+    ["x + y - y = 2", "x + y - y = 5"],
+    ["(2x + 3) * (y - y) = 7 - x", "(4x + 1) * (y - y) = 2 - x"],
+])
+def test_compiler_matches_solver(texts: List[str]) -> None:
+    compiler = Compiler()
+    for text in texts:
+        eq = parser(lexer(text))
+        assert compiler.solve(eq) == solver(eq)
+    assert compiler.info() == CacheInfo(hits=len(texts) - 1, misses=1, evictions=0, size=1, maxsize=1024)
+
+
+@pytest.mark.parametrize("text, error, error_msg", [
+    ("x * x = 1", ValueError, "Non-linear equation: product of variables"),
+    ("1 / (x + 1 / x) = 1", ValueError, "Non-linear equation: variable in a denominator"),
+    ("x / 0 = 1", ZeroDivisionError, "division by zero"),
+    ("x + y = 1", ValueError, "Expected exactly one variable, got x, y"),
+    ("x - x = 0", ValueError, "Identity: every value is a solution"),
+    ("x - x = 1", ValueError, "Contradiction: the equation has no solution"),
+    ("2 + 2 = 4", ValueError, "Identity: every value is a solution"),
+    ("(x - 1) / (x - 1) = 2", ValueError, "Contradiction: the equation has no solution (x = 1 makes"),
+    ("2 = (x - 1) / (2x - 2)", ValueError, "Contradiction: the equation has no solution (x = 1 makes"),
+    ("x / x = 1", ValueError, "Identity: every value is a solution except x = 0"),
+])
+def test_compiler_errors(text: str, error: type, error_msg: str) -> None:
+    eq = parser(lexer(text))
+    with pytest.raises(error, match=re.escape(error_msg)):
+        solver(eq)
+    with pytest.raises(error, match=re.escape(error_msg)):
+        Compiler().solve(eq)
+
+
+def test_compiled_function() -> None:
+    solve = compile_structure("= + x # #")
+    assert solve(Fraction(2), Fraction(3), Fraction(7)) == Root(Variable("x"), Literal(2))
+    assert solve(Fraction(4), Fraction(0), Fraction(2)) == Root(Variable("x"), Literal(Fraction(1, 2)))
+
+
+@pytest.mark.parametrize("key", ["", "+ # #", "= x", "= + x # # #"])
+def test_compile_invalid_structure(key: str) -> None:
+    with pytest.raises(ValueError, match="Invalid structure"):
+        compile_structure(key)
+
+
+def test_compiler_lru_eviction() -> None:
+    compiler = Compiler(maxsize=2)
+    compiler.solve("x = 1")
+    compiler.solve("x + 1 = 2")
+    compiler.solve("x = 5")
+    compiler.solve("x - 1 = 2")
+    assert compiler.info() == CacheInfo(hits=1, misses=3, evictions=1, size=2, maxsize=2)
+
+    with pytest.raises(ValueError, match="maxsize must be at least 1"):
+        Compiler(maxsize=0)
+
+
+def test_import_is_light() -> None:
+    # Só CacheInfo vem do lado do cache: nada de sqlite3, codec ou pipeline
+    code = "import sys, compiler; print(sorted({'cache', 'codec', 'pipeline', 'sqlite3'} & set(sys.modules)))"
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert output.stdout.strip() == "[]"
@@ -0,0 +1,220 @@
+from array import array
+from fractions import Fraction
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from linear import LinearForm
+from nodes import Node, Root, Literal, Variable, BinaryOp
+from solver import move_denominators, solution, solver
+
+
+# Representação struct-of-arrays de muitas equações: cada nó ocupa uma posição
+# nos arrays `opcodes`, `left` e `right`, em pós-ordem. Folhas guardam índices
+# para as tabelas de constantes e nomes em vez de filhos:
+#   LITERAL:  left = índice da constante
+#   VARIABLE: left = índice do coeficiente, right = índice do nome
+
+LITERAL = 0
+VARIABLE = 1
+ADD = 2
+SUB = 3
+MUL = 4
+DIV = 5
+
+_OPCODES = {"+": ADD, "-": SUB, "*": MUL, "/": DIV}
+_OPERATORS = {code: op for op, code in _OPCODES.items()}
+
+
+class FlatTree:
+    def __init__(self, roots: Iterable[Root] = ()):
+        self.opcodes = array("B")
+        self.left = array("i")
+        self.right = array("i")
+        self.constants: List[Fraction] = []
+        self.names: List[str] = []
+        # Por equação: primeiro nó e as raízes dos dois lados
+        self.starts = array("i")
+        self.lefts = array("i")
+        self.rights = array("i")
+        self._constant_index: Dict[Fraction, int] = {}
+        self._name_index: Dict[str, int] = {}
+
+        for root in roots:
+            self.append(root)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __iter__(self) -> Iterator[Root]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def __getitem__(self, index: int) -> Root:
+        return Root(self._build(self.lefts[index]), self._build(self.rights[index]))
+
+    def append(self, root: Root) -> int:
+        self.starts.append(len(self.opcodes))
+        self.lefts.append(self._flatten(root.left))
+        self.rights.append(self._flatten(root.right))
+        return len(self.starts) - 1
+
+    def solve(self, index: int) -> Root:
+        start = self.starts[index]
+        end = self.starts[index + 1] if index + 1 < len(self.starts) else len(self.opcodes)
+        result = self._solve(start, end, self.lefts[index], self.rights[index])
+        if result is None:
+            # Mais de uma variável ou equação inválida: o caminho geral decide
+            # a solução ou o erro exato a ser reportado
+            return solver(self[index])
+        return result
+
+    def solve_all(self) -> List[Root]:
+        return [self.solve(i) for i in range(len(self))]
+
+    def _constant(self, value) -> int:
+        value = Fraction(value)
+        index = self._constant_index.get(value)
+        if index is None:
+            index = self._constant_index[value] = len(self.constants)
+            self.constants.append(value)
+        return index
+
+    def _name(self, name: str) -> int:
+        index = self._name_index.get(name)
+        if index is None:
+            index = self._name_index[name] = len(self.names)
+            self.names.append(name)
+        return index
+
+    def _flatten(self, node: Node) -> int:
+        # Pós-ordem com pilha explícita; `positions` guarda os índices dos filhos já emitidos
+        positions: List[int] = []
+        stack: List[Tuple[Node, bool]] = [(node, False)]
+
+        while stack:
+            node, visited = stack.pop()
+
+            if isinstance(node, Literal):
+                self._emit(LITERAL, self._constant(node.value), -1)
+            elif isinstance(node, Variable):
+                self._emit(VARIABLE, self._constant(node.coef), self._name(node.name))
+            elif not isinstance(node, BinaryOp):
+                raise ValueError(f"Unexpected node: {node!r}")
+            elif not visited:
+                stack.append((node, True))
+                stack.append((node.right, False))
+                stack.append((node.left, False))
+                continue
+            else:
+                right = positions.pop()
+                left = positions.pop()
+                self._emit(_OPCODES[node.op], left, right)
+
+            positions.append(len(self.opcodes) - 1)
+
+        return positions[0]
+
+    def _emit(self, opcode: int, left: int, right: int) -> None:
+        self.opcodes.append(opcode)
+        self.left.append(left)
+        self.right.append(right)
+
+    def _build(self, index: int) -> Node:
+        # Os filhos de um nó sempre vêm antes dele, então basta percorrer o
+        # intervalo do nó em ordem mantendo os já construídos
+        start = index
+        while self.opcodes[start] > VARIABLE:
+            start = self.left[start]
+
+        built: Dict[int, Node] = {}
+        for i in range(start, index + 1):
+            opcode = self.opcodes[i]
+            if opcode == LITERAL:
+                built[i] = Literal(self.constants[self.left[i]])
+            elif opcode == VARIABLE:
+                built[i] = Variable(self.names[self.right[i]], self.constants[self.left[i]])
+            else:
+                built[i] = BinaryOp(_OPERATORS[opcode], built.pop(self.left[i]), built.pop(self.right[i]))  # type: ignore
+
+        return built[index]
+
+    def _solve(self, start: int, end: int, left_root: int, right_root: int) -> Optional[Root]:
+        # Forma linear por nó (coef * x + const) calculada direto sobre os arrays;
+        # os índices locais são relativos a `start`
+        opcodes, lefts, rights, constants = self.opcodes, self.left, self.right, self.constants
+        size = end - start
+        coef: List[Fraction] = [Fraction(0)] * size
+        const: List[Fraction] = [Fraction(0)] * size
+        has_var = bytearray(size)
+        # Divisões por expressões com variável só são válidas no topo de um dos
+        # lados (onde solver.solver as move de lado), então ficam pendentes
+        pending = bytearray(size)
+        name = -1
+
+        for i in range(start, end):
+            k = i - start
+            opcode = opcodes[i]
+
+            if opcode == LITERAL:
+                const[k] = constants[lefts[i]]
+                continue
+
+            if opcode == VARIABLE:
+                if name != -1 and rights[i] != name:
+                    return None
+                name = rights[i]
+                coef[k] = constants[lefts[i]]
+                has_var[k] = 1
+                continue
+
+            a, b = lefts[i] - start, rights[i] - start
+            has_var[k] = has_var[a] | has_var[b]
+            pending[k] = pending[a] or pending[b]
+
+            if opcode == ADD:
+                coef[k], const[k] = coef[a] + coef[b], const[a] + const[b]
+            elif opcode == SUB:
+                coef[k], const[k] = coef[a] - coef[b], const[a] - const[b]
+            elif opcode == MUL:
+                if coef[a] != 0 and coef[b] != 0:
+                    return None
+                coef[k], const[k] = coef[a] * const[b] + coef[b] * const[a], const[a] * const[b]
+            elif coef[b] != 0 or const[b] == 0 or pending[b]:
+                if not has_var[b]:
+                    return None
+                pending[k] = 1
+            else:
+                coef[k], const[k] = coef[a] / const[b], const[a] / const[b]
+
+        if name == -1:
+            return None
+
+        # a / (bx + c) = d -> a = d(bx + c), com a mesma regra de solver.solver
+        def split(k: int) -> Optional[Tuple[int, int]]:
+            i = k + start
+            if opcodes[i] == DIV and has_var[rights[i] - start]:
+                return lefts[i] - start, rights[i] - start
+            return None
+
+        left, right, left_factors, right_factors = move_denominators(left_root - start, right_root - start, split)
+
+        left_form = _side(left, left_factors, coef, const, pending)
+        right_form = _side(right, right_factors, coef, const, pending)
+        if left_form is None or right_form is None:
+            return None
+
+        variable = self.names[name]
+        denominators = [LinearForm({variable: coef[k]}, const[k]) for k in left_factors + right_factors]
+        return solution(LinearForm({variable: left_form[0] - right_form[0]}, left_form[1] - right_form[1]), denominators)
+
+
+def _side(k: int, factors: List[int], coef: List[Fraction], const: List[Fraction],
+          pending: bytearray) -> Optional[Tuple[Fraction, Fraction]]:
+    if pending[k]:
+        return None
+    a, b = coef[k], const[k]
+
+    for factor in factors:
+        if pending[factor] or (a != 0 and coef[factor] != 0):
+            return None
+        a, b = a * const[factor] + coef[factor] * b, b * const[factor]
+
+    return a, b
@@ -0,0 +1,80 @@
+import pytest
+from fractions import Fraction
+from flat import FlatTree, LITERAL, VARIABLE, ADD, DIV
+from lexer import lexer
+from nodes import Root, Literal, Variable, BinaryOp
+from parser import parser
+from solver import solver
+
+
+TEXTS = [
+    "5x / 2 = 10",
+    "1 / q = 2",
+    "3 = 2 / (x - 1)",
+    "2 + (-(-3 + 5 * x)) = 11",
+    "l = (1 + 2) / ((3 - 4) * (5 - 2))",
+    "b / 2 + b / 3 = 5",
+    "x + y - y = 2",
+    "x / (x - 2) = 2",
+]
+
+INVALID = [
+    "x + 1 = x",
+    "x + 1 = 1 + x",
+    "2x + y = 3",
+    "x * x = 1",
+    "1 / (1 / x) = 3",
+    "x = 1 / (2 - 2)",
+    "1 + 2 = 3",
+    # A solução anularia um denominador movido de lado
+    "x / (x - x) = 1",
+    "(x - 1) / (x - 1) = 2",
+    "x / x = 1",
+]
+
+
+def outcome(func):
+    try:
+        return func()
+    except (ValueError, ArithmeticError) as e:
+        return type(e), str(e)
+
+
+def test_flat_roundtrip() -> None:
+    roots = [parser(lexer(text)) for text in TEXTS + INVALID]
+    flat = FlatTree(roots)
+    assert len(flat) == len(roots)
+    assert list(flat) == roots
+
+
+def test_flat_layout() -> None:
+    # 2x / 4 = 3
+    flat = FlatTree([Root(BinaryOp("/", Variable("x", 2), Literal(4)), Literal(3))])
+    assert list(flat.opcodes) == [VARIABLE, LITERAL, DIV, LITERAL]
+    assert list(flat.left) == [0, 1, 0, 2]
+    assert list(flat.right) == [0, -1, 1, -1]
+    assert flat.constants == [Fraction(2), Fraction(4), Fraction(3)]
+    assert flat.names == ["x"]
+    assert (flat.lefts[0], flat.rights[0]) == (2, 3)
+
+
+def test_flat_shares_constants() -> None:
+    flat = FlatTree([parser(lexer("x + 1 = 2")), parser(lexer("1 + 2x = x"))])
+    assert flat.constants == [Fraction(1), Fraction(2)]
+    assert flat.names == ["x"]
+
+
+@pytest.mark.parametrize("text", TEXTS + INVALID)
+def test_flat_solve_matches_solver(text: str) -> None:
+    flat = FlatTree([parser(lexer("x = 0")), parser(lexer(text))])
+    assert outcome(lambda: flat.solve(1)) == outcome(lambda: solver(parser(lexer(text))))
+
+
+def test_flat_solve_all() -> None:
+    flat = FlatTree(parser(lexer(text)) for text in TEXTS)
+    assert flat.solve_all() == [solver(parser(lexer(text))) for text in TEXTS]
+
+
+def test_flat_opcode_values() -> None:
+    flat = FlatTree([Root(BinaryOp("+", Literal(1), Literal(2)), Variable())])
+    assert flat.opcodes[2] == ADD
@@ -0,0 +1,252 @@
+from bisect import bisect_left, bisect_right
+from fractions import Fraction
+from typing import Dict, List, Optional, Tuple, Union
+from lexer import Token, TokenType, token_spans
+from linear import LinearForm, combine, leaf_form
+from nodes import Node, Root, Literal, Variable, BinaryOp
+from parser import Parser, parse_number
+from pipeline import ERRORS
+from solver import move_denominators, solution
+
+
+# Equação editada aos poucos (um editor interativo): cada subárvore guarda a sua
+# forma linear, então trocar um número recalcula só o caminho da folha até a raiz.
+# Só o trecho editado é re-lexado; se a edição muda apenas valores de NUMBER a
+# estrutura é a mesma e nada é re-parseado. Qualquer outra edição reconstrói tudo
+
+Form = Union[LinearForm, Exception]
+
+
+class IncrementalEquation:
+    def __init__(self, text: str):
+        self.text = text
+        self._build()
+
+    @property
+    def root(self) -> Root:
+        if self._error is not None:
+            raise type(self._error)(*self._error.args)
+        return Root(self._nodes[self._left], self._nodes[self._right])
+
+    def update(self, text: str) -> None:
+        # Texto novo inteiro (como um editor costuma entregar): a edição é o
+        # trecho entre o maior prefixo e o maior sufixo em comum
+        old = self.text
+        size = min(len(old), len(text))
+        start = 0
+        while start < size and old[start] == text[start]:
+            start += 1
+        end = 0
+        while end < size - start and old[-1 - end] == text[-1 - end]:
+            end += 1
+        self.edit(start, len(old) - end, text[start:len(text) - end])
+
+    def edit(self, start: int, end: int, replacement: str) -> None:
+        if not 0 <= start <= end <= len(self.text):
+            raise ValueError(f"Invalid edit range: {start}..{end}")
+
+        text = self.text[:start] + replacement + self.text[end:]
+        delta = len(replacement) - (end - start)
+        self.text = text
+
+        if self._error is None:
+            # Tokens que encostam no trecho editado podem crescer, encolher ou se
+            # juntar com ele, então entram no trecho re-lexado
+            first = bisect_left(self._ends, start)
+            last = bisect_right(self._starts, end)
+            if first < last:
+                start = min(start, self._starts[first])
+                end = max(end, self._ends[last - 1])
+            try:
+                spans = token_spans(text, start, end + delta)
+            except ERRORS:
+                spans = None
+            if spans is not None and self._patch(first, last, spans, delta):
+                return
+
+        self._build()
+
+    def solve(self) -> Root:
+        if self._error is not None:
+            raise type(self._error)(*self._error.args)
+
+        forms = self._forms
+
+        # a / (bx + c) = d -> a = d(bx + c), com a mesma regra de solver.solver, mas
+        # com as formas já calculadas
+        left, right, left_factors, right_factors = move_denominators(self._left, self._right, self._split)
+        left_form, right_form = forms[left], forms[right]
+        for factor in left_factors:
+            left_form = _combine("*", left_form, forms[factor])
+        for factor in right_factors:
+            right_form = _combine("*", right_form, forms[factor])
+
+        form = _combine("-", left_form, right_form)
+        if isinstance(form, Exception):
+            raise type(form)(*form.args)
+        # Sem erro acima, as formas dos denominadores também não são erros
+        return solution(form, [forms[factor] for factor in left_factors + right_factors])  # type: ignore
+
+    def _split(self, cell: int) -> Optional[Tuple[int, int]]:
+        node = self._nodes[cell]
+        if isinstance(node, BinaryOp) and node.op == "/" and self._has_var[self._rights[cell]]:
+            return self._lefts[cell], self._rights[cell]
+        return None
+
+    def _build(self) -> None:
+        # Por célula (um nó da árvore, em pós-ordem): o nó, o pai, os filhos,
+        # a forma linear (ou o erro ao calculá-la) e se a subárvore tem variável
+        self._nodes: List[Node] = []
+        self._parents: List[int] = []
+        self._lefts: List[int] = []
+        self._rights: List[int] = []
+        self._forms: List[Form] = []
+        self._has_var: List[bool] = []
+        # Por token NUMBER: a célula da folha que ele gerou e o sinal aplicado
+        self._leaves: Dict[int, Tuple[int, int]] = {}
+
+        try:
+            spans = token_spans(self.text)
+            if not spans:
+                raise ValueError("Empty input text")
+            self._tokens = [token for token, _, _ in spans]
+            self._starts = [start for _, start, _ in spans]
+            self._ends = [end for _, _, end in spans]
+
+            parser = _TrackingParser(self._tokens)
+            root = parser.parse()
+        except ERRORS as e:
+            self._error: Optional[Exception] = e
+            return
+
+        self._error = None
+        self._left = self._cells(root.left, parser.sources)
+        self._right = self._cells(root.right, parser.sources)
+
+    def _cells(self, node: Node, sources: Dict[int, Tuple[Node, int, int]]) -> int:
+        results: List[int] = []
+        stack: List[Tuple[Node, bool]] = [(node, False)]
+
+        while stack:
+            node, visited = stack.pop()
+
+            if isinstance(node, BinaryOp) and not visited:
+                stack.append((node, True))
+                stack.append((node.right, False))
+                stack.append((node.left, False))
+                continue
+
+            cell = len(self._nodes)
+            self._nodes.append(node)
+            self._parents.append(-1)
+
+            if isinstance(node, BinaryOp):
+                right = results.pop()
+                left = results.pop()
+                self._parents[left] = self._parents[right] = cell
+                self._lefts.append(left)
+                self._rights.append(right)
+                self._forms.append(_combine(node.op, self._forms[left], self._forms[right]))
+                self._has_var.append(self._has_var[left] or self._has_var[right])
+            else:
+                self._lefts.append(-1)
+                self._rights.append(-1)
+                self._forms.append(leaf_form(node))
+                self._has_var.append(isinstance(node, Variable))
+                source = sources.get(id(node))
+                if source is not None:
+                    self._leaves[source[1]] = (cell, source[2])
+
+            results.append(cell)
+
+        return results[0]
+
+    def _patch(self, first: int, last: int, spans: List[Tuple[Token, int, int]], delta: int) -> bool:
+        # Mesma sequência de tokens a menos de valores de NUMBER: a árvore mantém
+        # a forma e só as folhas desses números mudam
+        tokens = self._tokens
+        if len(spans) != last - first:
+            return False
+
+        changed: List[int] = []
+        for index, (token, _, _) in enumerate(spans, first):
+            previous = tokens[index]
+            if token == previous:
+                continue
+            if token.type != TokenType.NUMBER or previous.type != TokenType.NUMBER:
+                return False
+            changed.append(index)
+
+        for index, (token, start, end) in enumerate(spans, first):
+            tokens[index] = token
+            self._starts[index] = start
+            self._ends[index] = end
+        if delta:
+            starts, ends = self._starts, self._ends
+            for index in range(last, len(tokens)):
+                starts[index] += delta
+                ends[index] += delta
+
+        for index in changed:
+            self._set(index, parse_number(tokens[index].value))
+        return True
+
+    def _set(self, token: int, number: Union[int, Fraction]) -> None:
+        cell, sign = self._leaves[token]
+        nodes, parents, lefts, rights, forms = self._nodes, self._parents, self._lefts, self._rights, self._forms
+        value = number if sign == 1 else -number
+
+        node = nodes[cell]
+        if isinstance(node, Variable):
+            node = Variable(node.name, value)
+        else:
+            node = Literal(value)
+        nodes[cell] = node
+        forms[cell] = leaf_form(node)
+
+        # Só os ancestrais da folha: os nós são imutáveis, então cada um é refeito
+        # apontando para o filho novo, e as subárvores irmãs são reaproveitadas
+        cell = parents[cell]
+        while cell != -1:
+            left, right = lefts[cell], rights[cell]
+            op = nodes[cell].op  # type: ignore
+            nodes[cell] = BinaryOp(op, nodes[left], nodes[right])
+            forms[cell] = _combine(op, forms[left], forms[right])
+            cell = parents[cell]
+
+
+class _TrackingParser(Parser):
+    # Anota de qual token NUMBER veio cada folha, e com que sinal, para que a
+    # edição de um número saiba qual folha trocar
+
+    def __init__(self, tokens: List[Token]):
+        super().__init__(tokens)
+        # id(folha) -> (folha, índice do token, sinal); a folha fica viva para o id não ser reusado
+        self.sources: Dict[int, Tuple[Node, int, int]] = {}
+
+    def foo(self, token: Token, sign: int) -> Node:
+        index = self._i
+        node = super().foo(token, sign)
+        if token.type == TokenType.NUMBER:
+            self.sources[id(node)] = (node, index, sign)
+        return node
+
+    def _negate(self, node: Node) -> Node:
+        negated = super()._negate(node)
+        source = self.sources.pop(id(node), None)
+        if source is not None:
+            self.sources[id(negated)] = (negated, source[1], -source[2])
+        return negated
+
+
+def _combine(op: str, left: Form, right: Form) -> Form:
+    # Um erro numa subárvore sobe até a raiz; como em linear_form, vale o primeiro
+    # em pós-ordem. combine altera os operandos, então recebe cópias
+    if isinstance(left, Exception):
+        return left
+    if isinstance(right, Exception):
+        return right
+    try:
+        return combine(op, left.copy(), right.copy())
+    except ERRORS as e:
+        return e
@@ -0,0 +1,77 @@
+import re
+import pytest
+from typing import List, Tuple
+from incremental import IncrementalEquation
+from lexer import lexer
+from nodes import Root, Literal, Variable
+from parser import parser
+from solver import solver
+
+
+@pytest.mark.parametrize("text, edits", [
+    ("2x + 3 = 7", [(5, 6, "5"), (0, 1, "4"), (9, 10, "21")]),
+    ("-(2x) - 3 = 7", [(2, 3, "6"), (8, 9, "5"), (12, 13, "3")]),
+    ("10 / (x + 1) = 2", [(10, 11, "5"), (0, 2, "20"), (15, 16, "4")]),
+    ("2 * (j + 3) = 4j - 2", [(9, 10, "1"), (14, 15, "3")]),
+    # Edições que mudam a estrutura caem na reconstrução completa
+    ("2x + 3 = 7", [(3, 4, "-"), (1, 2, "y"), (0, 0, "(x - y) * 0 + ")]),
+    ("2 + 3 = x", [(1, 4, ""), (1, 1, "+")]),
+])
+def test_incremental_matches_solver(text: str, edits: List[Tuple[int, int, str]]) -> None:
+    eq = IncrementalEquation(text)
+    for start, end, replacement in edits:
+        text = text[:start] + replacement + text[end:]
+        eq.edit(start, end, replacement)
+        assert eq.text == text
+        assert eq.root == parser(lexer(text))
+        assert eq.solve() == solver(parser(lexer(text)))
+
+
+def test_incremental_keeps_untouched_subtrees() -> None:
+    eq = IncrementalEquation("2x + 3 = 7 * (4 - 1)")
+    left, right = eq.root.left, eq.root.right
+    eq.edit(5, 6, "5")
+
+    assert eq.root.right is right
+    assert eq.root.left is not left
+    assert eq.root.left.left is left.left  # type: ignore
+    assert eq.solve() == Root(Variable("x"), Literal(8))
+
+
+def test_incremental_update() -> None:
+    eq = IncrementalEquation("2x + 3 = 7")
+    for text in ["2x + 35 = 7", "2x + 5 = 7", "2x + 5 = 71", "2x = 71"]:
+        eq.update(text)
+        assert eq.text == text
+        assert eq.solve() == solver(parser(lexer(text)))
+
+
+def test_incremental_recovers_from_invalid_text() -> None:
+    eq = IncrementalEquation("2x + 3 = 7")
+    eq.update("2x + = 7")
+    with pytest.raises(ValueError, match="Unexpected token"):
+        eq.solve()
+    with pytest.raises(ValueError, match="Unexpected token"):
+        eq.root
+
+    eq.update("2x + 9 = 7")
+    assert eq.solve() == Root(Variable("x"), Literal(-1))
+
+
+@pytest.mark.parametrize("text, edit, error, error_msg", [
+    ("x / 2 = 1", (4, 5, "0"), ZeroDivisionError, "division by zero"),
+    ("2x - x = 1", (0, 1, "1"), ValueError, "Contradiction: the equation has no solution"),
+    ("2x - x = 0", (0, 1, "1"), ValueError, "Identity: every value is a solution"),
+    ("(x - 1) / (x - 1) = 3", (20, 21, "2"), ValueError, "Contradiction: the equation has no solution (x = 1 makes"),
+    ("x / (x - 2) = 1", (9, 10, "0"), ValueError, "Identity: every value is a solution except x = 0"),
+])
+def test_incremental_errors(text: str, edit: Tuple[int, int, str], error: type, error_msg: str) -> None:
+    eq = IncrementalEquation(text)
+    eq.edit(*edit)
+    with pytest.raises(error, match=re.escape(error_msg)):
+        eq.solve()
+
+
+def test_incremental_invalid_range() -> None:
+    with pytest.raises(ValueError, match="Invalid edit range"):
+        IncrementalEquation("x = 1").edit(3, 9, "2")
@@ -0,0 +1,91 @@
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from nodes import Node, Root, BinaryOp
+
+
+# Instrumentação opcional: tempo por estágio, contagens (tokens, nós, regras do
+# solver que dispararam, erros) e máximos (profundidade da árvore).
+# Desligada, `active` é None e cada ponto instrumentado custa só essa verificação.
+# O estado é por processo: os workers de solve_parallel não registram aqui
+
+# callback(tipo, nome, valor), com tipo "time", "count" ou "max"
+Callback = Callable[[str, str, float], None]
+
+
+class Stats:
+    def __init__(self, callback: Optional[Callback] = None):
+        self.callback = callback
+        self.timings: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+        self.maxima: Dict[str, int] = {}
+
+    def time(self, name: str, seconds: float) -> None:
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+        if self.callback is not None:
+            self.callback("time", name, seconds)
+
+    def count(self, name: str, amount: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + amount
+        if self.callback is not None:
+            self.callback("count", name, amount)
+
+    def maximum(self, name: str, value: int) -> None:
+        if value > self.maxima.get(name, value - 1):
+            self.maxima[name] = value
+        if self.callback is not None:
+            self.callback("max", name, value)
+
+    def reset(self) -> None:
+        self.timings.clear()
+        self.counters.clear()
+        self.maxima.clear()
+
+    def as_dict(self) -> Dict[str, Dict[str, float]]:
+        return {"timings": dict(self.timings), "counters": dict(self.counters), "maxima": dict(self.maxima)}
+
+
+active: Optional[Stats] = None
+
+
+def enable(callback: Optional[Callback] = None) -> Stats:
+    global active
+    active = Stats(callback)
+    return active
+
+
+def disable() -> Optional[Stats]:
+    global active
+    stats, active = active, None
+    return stats
+
+
+@contextmanager
+def instrumented(callback: Optional[Callback] = None) -> Iterator[Stats]:
+    global active
+    previous = active
+    stats = active = Stats(callback)
+    try:
+        yield stats
+    finally:
+        active = previous
+
+
+def tree_shape(root: Root) -> Tuple[int, int, Dict[str, int]]:
+    # Número de nós, profundidade (o que seria a profundidade de recursão de um
+    # percurso recursivo) e quantos nós de cada operador
+    nodes = 0
+    depth = 0
+    operators: Dict[str, int] = {}
+    stack: List[Tuple[Node, int]] = [(root.left, 1), (root.right, 1)]
+
+    while stack:
+        node, level = stack.pop()
+        nodes += 1
+        if level > depth:
+            depth = level
+        if isinstance(node, BinaryOp):
+            operators[node.op] = operators.get(node.op, 0) + 1
+            stack.append((node.right, level + 1))
+            stack.append((node.left, level + 1))
+
+    return nodes, depth, operators
@@ -0,0 +1,58 @@
+import pytest
+from typing import List, Tuple
+import instrument
+from lexer import lexer
+from parser import parser
+from pipeline import solve, solve_many
+
+
+def test_disabled_by_default() -> None:
+    assert instrument.active is None
+    solve("2x = 4")
+    assert instrument.active is None
+
+
+def test_instrumented_stages_and_counters() -> None:
+    with instrument.instrumented() as stats:
+        solve("2x + 3 = 7")
+        solve_many(["10 / (x + 1) = 2", "x + y = 1", "x @ 1 = 2"])
+
+    assert instrument.active is None
+    assert set(stats.timings) == {"lex", "parse", "solve", "total"}
+    assert stats.timings["total"] >= stats.timings["lex"] + stats.timings["parse"] + stats.timings["solve"]
+    assert stats.counters == {
+        "equations": 4,
+        "tokens": 6 + 9 + 5,
+        "nodes": 4 + 6 + 4,
+        "nodes.+": 3,
+        "nodes./": 1,
+        "solver.solved": 2,
+        "solver.cross_multiply_left": 1,
+        "solver.multiple_variables": 1,
+        "errors.solve.ValueError": 1,
+        "errors.lex.ValueError": 1,
+    }
+    assert stats.maxima == {"depth": 3}
+
+
+def test_callback_and_enable() -> None:
+    events: List[Tuple[str, str, float]] = []
+    stats = instrument.enable(lambda kind, name, value: events.append((kind, name, value)))
+    try:
+        solve("x - 1 = 1")
+    finally:
+        assert instrument.disable() is stats
+    assert instrument.active is None
+
+    assert ("count", "equations", 1) in events
+    assert ("count", "solver.solved", 1) in events
+    assert ("max", "depth", 2) in events
+    assert [name for kind, name, _ in events if kind == "time"] == ["lex", "parse", "solve", "total"]
+
+    stats.reset()
+    assert stats.as_dict() == {"timings": {}, "counters": {}, "maxima": {}}
+
+
+def test_tree_shape() -> None:
+    nodes, depth, operators = instrument.tree_shape(parser(lexer("2 * (x + 1) / 3 = x - 4")))
+    assert (nodes, depth, operators) == (10, 4, {"/": 1, "*": 1, "+": 1, "-": 1})
@@ -1,7 +1,7 @@
 import re
 from dataclasses import dataclass
 from enum import IntEnum
-from typing import List
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple, Union
 
 
 class TokenType(IntEnum):
@@ -15,6 +15,8 @@ class TokenType(IntEnum):
     DIGIT = 7
     DOT = 8
     LETTER = 9
+    NUMBER = 10
+    IDENT = 11
 
 
 @dataclass(frozen=True)
@@ -31,35 +33,113 @@ class Token:
         return self.type == other.type and self.value == other.value
 
 
+# Single-character tokens never change, so the same instances are shared by every call
+_SYMBOLS: Dict[str, Token] = {
+    "=": Token(TokenType.EQUAL, "="),
+    "+": Token(TokenType.PLUS, "+"),
+    "-": Token(TokenType.MINUS, "-"),
+    "*": Token(TokenType.MULTIPLY, "*"),
+    "/": Token(TokenType.DIVIDE, "/"),
+    "(": Token(TokenType.LPAREN, "("),
+    ")": Token(TokenType.RPAREN, ")"),
+    ".": Token(TokenType.DOT, "."),
+}
+
+# One alternative per group: NUMBER, IDENT, symbol, whitespace and anything else (invalid).
+# Whitespace is a match of its own (and skipped by the callers): a leading \s* would
+# rescan a whitespace run from every position of it when no token follows
+_TOKEN_RE = re.compile(r"(\d+(?:\.\d*)?|\.\d+)|([^\W\d_]+)|([=+\-*/().])|(\s+)|(.)", re.S)
+
+_NUMBER = 1
+_IDENT = 2
+_SYMBOL = 3
+_SPACE = 4
+
+# Whitespace only matters between two characters of the same number or name ("2 3"),
+# there it collapses to one space; everywhere else it is dropped
+_SPACE_RE = re.compile(r"(?<=[\w.])(\s+)(?=[\w.])|\s+")
+
+
 def lexer(text: str) -> List[Token]:
-    text = re.sub(r"\s+", "", text)
     tokens: List[Token] = []
+    append = tokens.append
 
-    if len(text) == 0:
-        raise ValueError("Empty input text")
+    for match in _TOKEN_RE.finditer(text):
+        kind = match.lastindex
+        if kind == _SYMBOL:
+            append(_SYMBOLS[match.group()])
+        elif kind == _NUMBER:
+            append(Token(TokenType.NUMBER, match.group()))
+        elif kind == _IDENT:
+            append(Token(TokenType.IDENT, match.group()))
+        elif kind != _SPACE:
+            raise ValueError(f"Invalid character: {match.group()}")
 
-    for char in text:
-        if char == "=":
-            tokens.append(Token(TokenType.EQUAL, char))
-        elif char == "+":
-            tokens.append(Token(TokenType.PLUS, char))
-        elif char == "-":
-            tokens.append(Token(TokenType.MINUS, char))
-        elif char == "*":
-            tokens.append(Token(TokenType.MULTIPLY, char))
-        elif char == "/":
-            tokens.append(Token(TokenType.DIVIDE, char))
-        elif char == "(":
-            tokens.append(Token(TokenType.LPAREN, char))
-        elif char == ")":
-            tokens.append(Token(TokenType.RPAREN, char))
-        elif char.isdigit():
-            tokens.append(Token(TokenType.DIGIT, char))
-        elif char == ".":
-            tokens.append(Token(TokenType.DOT, char))
-        elif char.isalpha():
-            tokens.append(Token(TokenType.LETTER, char))
-        else:
-            raise ValueError(f"Invalid character: {char}")
+    if len(tokens) == 0:
+        raise ValueError("Empty input text")
 
     return tokens
+
+
+def token_spans(text: str, start: int = 0, end: Optional[int] = None) -> List[Tuple[Token, int, int]]:
+    # Tokens de text[start:end] junto com a posição de cada um no texto,
+    # para re-lexar só o trecho editado (ver incremental.py)
+    if end is None:
+        end = len(text)
+    return [
+        (_token(match), match.start(), match.end())
+        for match in _TOKEN_RE.finditer(text, start, end)
+        if match.lastindex != _SPACE
+    ]
+
+
+def normalize(text: str) -> str:
+    # Texto canônico de uma equação: lexer(normalize(text)) == lexer(text)
+    return _SPACE_RE.sub(_space, text)
+
+
+def _space(match: "re.Match[str]") -> str:
+    return " " if match.group(1) else ""
+
+
+def iter_tokens(source: Union[str, TextIO], chunk_size: int = 1 << 16) -> Iterator[Token]:
+    empty = True
+
+    if isinstance(source, str):
+        for match in _TOKEN_RE.finditer(source):
+            if match.lastindex != _SPACE:
+                empty = False
+                yield _token(match)
+    else:
+        pending = ""
+        for chunk in iter(lambda: source.read(chunk_size), ""):
+            text = pending + chunk
+            pending = ""
+            for match in _TOKEN_RE.finditer(text):
+                if match.lastindex == _SPACE:
+                    continue
+                # A token touching the end of the chunk may continue in the next one
+                # (whitespace there is just dropped, it only separates tokens)
+                if match.end() == len(text):
+                    pending = match.group()
+                    break
+                empty = False
+                yield _token(match)
+
+        for match in _TOKEN_RE.finditer(pending):
+            empty = False
+            yield _token(match)
+
+    if empty:
+        raise ValueError("Empty input text")
+
+
+def _token(match: "re.Match[str]") -> Token:
+    kind = match.lastindex
+    if kind == _SYMBOL:
+        return _SYMBOLS[match.group()]
+    if kind == _NUMBER:
+        return Token(TokenType.NUMBER, match.group())
+    if kind == _IDENT:
+        return Token(TokenType.IDENT, match.group())
+    raise ValueError(f"Invalid character: {match.group()}")
@@ -1,48 +1,71 @@
+import io
 import re
 import pytest
-from lexer import Token, TokenType, lexer
+from lexer import Token, TokenType, iter_tokens, lexer, normalize, token_spans
 from typing import List
 
 
 @pytest.mark.parametrize("text, tokens", [
     ("x * 3 - 3x   ", [
-        Token(TokenType.LETTER, "x"),
+        Token(TokenType.IDENT, "x"),
         Token(TokenType.MULTIPLY, "*"),
-        Token(TokenType.DIGIT, "3"),
+        Token(TokenType.NUMBER, "3"),
         Token(TokenType.MINUS, "-"),
-        Token(TokenType.DIGIT, "3"),
-        Token(TokenType.LETTER, "x"),
+        Token(TokenType.NUMBER, "3"),
+        Token(TokenType.IDENT, "x"),
     ]),
     ("(x -    2)\t / 5", [
         Token(TokenType.LPAREN, "("),
-        Token(TokenType.LETTER, "x"),
+        Token(TokenType.IDENT, "x"),
         Token(TokenType.MINUS, "-"),
-        Token(TokenType.DIGIT, "2"),
+        Token(TokenType.NUMBER, "2"),
         Token(TokenType.RPAREN, ")"),
         Token(TokenType.DIVIDE, "/"),
-        Token(TokenType.DIGIT, "5")
+        Token(TokenType.NUMBER, "5")
     ]),
     ("   -3x + 2=5", [
         Token(TokenType.MINUS, "-"),
-        Token(TokenType.DIGIT, "3"),
-        Token(TokenType.LETTER, "x"),
+        Token(TokenType.NUMBER, "3"),
+        Token(TokenType.IDENT, "x"),
         Token(TokenType.PLUS, "+"),
-        Token(TokenType.DIGIT, "2"),
+        Token(TokenType.NUMBER, "2"),
         Token(TokenType.EQUAL, "="),
-        Token(TokenType.DIGIT, "5")
+        Token(TokenType.NUMBER, "5")
     ]),
     ("-.5 + 5.25\r\n/5", [
         Token(TokenType.MINUS, "-"),
-        Token(TokenType.DOT, "."),
-        Token(TokenType.DIGIT, "5"),
+        Token(TokenType.NUMBER, ".5"),
         Token(TokenType.PLUS, "+"),
-        Token(TokenType.DIGIT, "5"),
-        Token(TokenType.DOT, "."),
-        Token(TokenType.DIGIT, "2"),
-        Token(TokenType.DIGIT, "5"),
+        Token(TokenType.NUMBER, "5.25"),
+        Token(TokenType.DIVIDE, "/"),
+        Token(TokenType.NUMBER, "5"),
+    ]),
+    ("12.5y = 100 / 3.", [
+        Token(TokenType.NUMBER, "12.5"),
+        Token(TokenType.IDENT, "y"),
+        Token(TokenType.EQUAL, "="),
+        Token(TokenType.NUMBER, "100"),
         Token(TokenType.DIVIDE, "/"),
-        Token(TokenType.DIGIT, "5"),
-    ])
+        Token(TokenType.NUMBER, "3."),
+    ]),
+    ("ab . = 1", [
+        Token(TokenType.IDENT, "ab"),
+        Token(TokenType.DOT, "."),
+        Token(TokenType.EQUAL, "="),
+        Token(TokenType.NUMBER, "1"),
+    ]),
+    # Espaço separa tokens: "2 3" são dois números, não 23 como antes do lexer por regex
+    ("2 3 = x", [
+        Token(TokenType.NUMBER, "2"),
+        Token(TokenType.NUMBER, "3"),
+        Token(TokenType.EQUAL, "="),
+        Token(TokenType.IDENT, "x"),
+    ]),
+    ("1 . 5", [
+        Token(TokenType.NUMBER, "1"),
+        Token(TokenType.DOT, "."),
+        Token(TokenType.NUMBER, "5"),
+    ]),
 ])
 def test_lexer(text: str, tokens: List[Token]) -> None:
     assert lexer(text) == tokens
@@ -63,3 +86,53 @@ def test_lexer(text: str, tokens: List[Token]) -> None:
 def test_lexer_invalid(text: str, error_msg: str) -> None:
     with pytest.raises(ValueError, match=re.escape(error_msg)):
         lexer(text)
+
+
+@pytest.mark.parametrize("text", [
+    "x * 3 - 3x   ",
+    "-.5 + 5.25\r\n/5",
+    "12.5y = 100 / 3.",
+    "  123456.789z + (42 - 7.5) = ab . 1  ",
+])
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 1 << 16])
+def test_iter_tokens_stream(text: str, chunk_size: int) -> None:
+    assert list(iter_tokens(io.StringIO(text), chunk_size)) == lexer(text)
+    assert list(iter_tokens(text)) == lexer(text)
+
+
+@pytest.mark.parametrize("source, error_msg", [
+    ("", "Empty input text"),
+    (io.StringIO(" \n\t "), "Empty input text"),
+    (io.StringIO("2x + 4$ = 10"), "Invalid character: $"),
+])
+def test_iter_tokens_invalid(source, error_msg: str) -> None:
+    with pytest.raises(ValueError, match=re.escape(error_msg)):
+        list(iter_tokens(source, 3))
+
+
+def test_long_whitespace_run() -> None:
+    # Um espaço em branco longo sem token depois não pode ser re-lido a partir de
+    # cada posição: quadrático, isto levaria minutos em vez de milissegundos
+    text = "x = 1" + " " * 20000
+    expected = [Token(TokenType.IDENT, "x"), Token(TokenType.EQUAL, "="), Token(TokenType.NUMBER, "1")]
+
+    assert lexer(text) == expected
+    assert list(iter_tokens(text)) == expected
+    assert list(iter_tokens(io.StringIO(text), 4096)) == expected
+    assert [token for token, _, _ in token_spans(text)] == expected
+
+
+def test_iter_tokens_is_lazy() -> None:
+    tokens = iter_tokens("1 + 2 = x $")
+    assert next(tokens) == Token(TokenType.NUMBER, "1")
+
+
+@pytest.mark.parametrize("text, normalized", [
+    ("2x = 10", "2x=10"),
+    (" ( x -  2 )\t/ 5\n", "(x-2)/5"),
+    ("2 3 = x", "2 3=x"),
+    ("1 . 5 = a  b", "1 . 5=a b"),
+])
+def test_normalize(text: str, normalized: str) -> None:
+    assert normalize(text) == normalized
+    assert lexer(normalized) == lexer(text)
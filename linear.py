@@ -0,0 +1,167 @@
+from dataclasses import dataclass, field
+from fractions import Fraction
+from typing import Dict, List, Optional, Tuple, Union
+from nodes import Node, Root, Literal, Variable, BinaryOp
+
+Rational = Union[int, Fraction]
+
+
+# Forma linear compacta de uma expressão: (sum(coefs[v] * v) + const) / den.
+# Com literais inteiros tudo fica em int e den em 1; uma divisão só multiplica den,
+# sem mdc a cada operação: a redução fica para quem lê o resultado (solver.solution)
+@dataclass(eq=False)
+class LinearForm:
+    coefs: Dict[str, Rational] = field(default_factory=dict)
+    const: Rational = 0
+    den: int = 1
+
+    def is_constant(self) -> bool:
+        return not any(self.coefs.values())
+
+    def variables(self) -> List[str]:
+        return [name for name, coef in self.coefs.items() if coef != 0]
+
+    def coef(self, name: str) -> Fraction:
+        return Fraction(self.coefs.get(name, 0), self.den)
+
+    def value(self) -> Fraction:
+        return Fraction(self.const, self.den)
+
+    def copy(self) -> "LinearForm":
+        return LinearForm(dict(self.coefs), self.const, self.den)
+
+    def __eq__(self, other: object) -> bool:
+        # Mesma forma a menos do denominador comum
+        if not isinstance(other, LinearForm):
+            return NotImplemented
+        return (
+            self.coefs.keys() == other.coefs.keys()
+            and all(coef * other.den == other.coefs[name] * self.den for name, coef in self.coefs.items())
+            and self.const * other.den == other.const * self.den
+        )
+
+
+def rational(value: Union[int, float, Fraction]) -> Tuple[int, int]:
+    # (numerador, denominador) de um literal ou coeficiente
+    if type(value) is int:
+        return value, 1  # type: ignore
+    if not isinstance(value, Fraction):
+        value = Fraction(value)
+    return value.numerator, value.denominator
+
+
+def leaf_form(node: Node) -> LinearForm:
+    if isinstance(node, Variable):
+        coef, den = rational(node.coef)
+        return LinearForm({node.name: coef}, 0, den)
+    if isinstance(node, Literal):
+        const, den = rational(node.value)
+        return LinearForm({}, const, den)
+    raise ValueError(f"Unexpected node: {node!r}")
+
+
+def linear_form(expr: Node, memo: Optional[Dict[int, Tuple[Node, LinearForm]]] = None) -> LinearForm:
+    # Uma única passada pós-ordem (com pilha explícita) reduz cada nó à sua forma
+    # linear; os resultados intermediários pertencem só ao percurso, então são
+    # reaproveitados no lugar em vez de copiados.
+    # Com `memo` (id do nó -> (nó, forma)), subárvores compartilhadas por
+    # hash-consing são reduzidas uma única vez; o memo guarda cópias
+    results: List[LinearForm] = []
+    stack: List[Tuple[Node, bool]] = [(expr, False)]
+
+    while stack:
+        node, visited = stack.pop()
+
+        if memo is not None and not visited:
+            cached = memo.get(id(node))
+            if cached is not None:
+                results.append(cached[1].copy())
+                continue
+
+        if not isinstance(node, BinaryOp):
+            results.append(leaf_form(node))
+        elif not visited:
+            stack.append((node, True))
+            stack.append((node.right, False))
+            stack.append((node.left, False))
+        else:
+            right = results.pop()
+            left = results.pop()
+            results.append(combine(node.op, left, right))
+            if memo is not None:
+                memo[id(node)] = (node, results[-1].copy())
+
+    return results[0]
+
+
+def combine(op: str, left: LinearForm, right: LinearForm) -> LinearForm:
+    if op == "+":
+        return _add(left, right, 1)
+
+    if op == "-":
+        return _add(left, right, -1)
+
+    if op == "*":
+        if right.is_constant():
+            return _scale(left, right.const, right.den)
+        if left.is_constant():
+            return _scale(right, left.const, left.den)
+        raise ValueError("Non-linear equation: product of variables")
+
+    if op == "/":
+        if not right.is_constant():
+            raise ValueError("Non-linear equation: variable in a denominator")
+        if right.const == 0:
+            raise ZeroDivisionError("division by zero")
+        return _scale(left, right.den, right.const)
+
+    raise ValueError(f"Unknown operator: {op}")
+
+
+def _add(left: LinearForm, right: LinearForm, sign: int) -> LinearForm:
+    coefs = left.coefs
+    factor = 1
+
+    # Leva os dois lados ao mesmo denominador; quando um divide o outro basta
+    # escalar um deles
+    if left.den != right.den:
+        if left.den % right.den == 0:
+            factor = left.den // right.den
+        else:
+            scale = right.den
+            if right.den % left.den == 0:
+                scale //= left.den
+            else:
+                factor = left.den
+            for name in coefs:
+                coefs[name] *= scale
+            left.const *= scale
+            left.den *= scale
+
+    if factor == 1:
+        for name, coef in right.coefs.items():
+            coefs[name] = coefs.get(name, 0) + sign * coef
+        left.const += sign * right.const
+    else:
+        for name, coef in right.coefs.items():
+            coefs[name] = coefs.get(name, 0) + sign * factor * coef
+        left.const += sign * factor * right.const
+    return left
+
+
+def _scale(form: LinearForm, numerator: Rational, denominator: Rational) -> LinearForm:
+    # form * numerator / denominator, mantendo den positivo
+    if denominator < 0:
+        numerator, denominator = -numerator, -denominator
+    if numerator != 1:
+        coefs = form.coefs
+        for name in coefs:
+            coefs[name] *= numerator
+        form.const *= numerator
+    form.den *= denominator  # type: ignore
+    return form
+
+
+def equation_form(eq: Root, memo: Optional[Dict[int, Tuple[Node, LinearForm]]] = None) -> LinearForm:
+    # left - right = 0
+    return _add(linear_form(eq.left, memo), linear_form(eq.right, memo), -1)
@@ -0,0 +1,88 @@
+import re
+import pytest
+from fractions import Fraction
+from linear import LinearForm, linear_form, equation_form
+from nodes import Node, Root, Literal, Variable, BinaryOp
+
+
+@pytest.mark.parametrize("node, form", [
+    (Literal(3), LinearForm({}, Fraction(3))),
+    (Variable("x", -2), LinearForm({"x": Fraction(-2)}, Fraction(0))),
+    # 2 * (x + 3) - x / 4
+    (BinaryOp("-", BinaryOp("*", Literal(2), BinaryOp("+", Variable("x"), Literal(3))),
+              BinaryOp("/", Variable("x"), Literal(4))),
+     LinearForm({"x": Fraction(7, 4)}, Fraction(6))),
+    # (x + y) * 3 - 2y
+    (BinaryOp("-", BinaryOp("*", BinaryOp("+", Variable("x"), Variable("y")), Literal(3)), Variable("y", 2)),
+     LinearForm({"x": Fraction(3), "y": Fraction(1)}, Fraction(0))),
+    # 2 - (3 - x)
+    (BinaryOp("-", Literal(2), BinaryOp("-", Literal(3), Variable("x"))),
+     LinearForm({"x": Fraction(1)}, Fraction(-1))),
+])
+def test_linear_form(node: Node, form: LinearForm) -> None:
+    assert linear_form(node) == form
+
+
+def test_linear_form_does_not_mutate_tree() -> None:
+    x = Variable("x", 2)
+    node = BinaryOp("*", BinaryOp("+", x, x), Literal(3))
+    linear_form(node)
+    assert x == Variable("x", 2)
+
+
+def test_equation_form() -> None:
+    # 2x + 1 = x - 3 -> x + 4 = 0
+    eq = Root(BinaryOp("+", Variable("x", 2), Literal(1)), BinaryOp("-", Variable("x"), Literal(3)))
+    form = equation_form(eq)
+    assert form == LinearForm({"x": Fraction(1)}, Fraction(4))
+    assert form.variables() == ["x"]
+    assert not form.is_constant()
+
+
+@pytest.mark.parametrize("node, error_msg", [
+    (BinaryOp("*", Variable("x"), Variable("x")), "Non-linear equation: product of variables"),
+    (BinaryOp("/", Literal(1), BinaryOp("+", Variable("x"), Literal(1))), "Non-linear equation: variable in a denominator"),
+])
+def test_linear_form_nonlinear(node: Node, error_msg: str) -> None:
+    with pytest.raises(ValueError, match=re.escape(error_msg)):
+        linear_form(node)
+
+
+def test_linear_form_division_by_zero() -> None:
+    with pytest.raises(ZeroDivisionError):
+        linear_form(BinaryOp("/", Variable("x"), BinaryOp("-", Literal(2), Literal(2))))
+
+
+def test_linear_form_long_chain() -> None:
+    node: Node = Variable("x")
+    for i in range(1, 20000):
+        node = BinaryOp("-" if i % 2 else "+", node, Literal(i))
+    assert linear_form(node) == LinearForm({"x": Fraction(1)}, Fraction(-10000))
+
+
+def test_linear_form_stays_integer_until_division() -> None:
+    # 3 * (2x + 5) - 4
+    form = linear_form(BinaryOp("-", BinaryOp("*", Literal(3), BinaryOp("+", Variable("x", 2), Literal(5))), Literal(4)))
+    assert (form.coefs, form.const, form.den) == ({"x": 6}, 11, 1)
+    assert type(form.coefs["x"]) is int and type(form.const) is int
+
+    # (x + 1) / 3 + x / 6: só o denominador comum muda, sem mdc no caminho
+    form = linear_form(BinaryOp("+", BinaryOp("/", BinaryOp("+", Variable("x"), Literal(1)), Literal(3)),
+                                BinaryOp("/", Variable("x"), Literal(6))))
+    assert (form.coefs, form.const, form.den) == ({"x": 3}, 2, 6)
+    assert form.coef("x") == Fraction(1, 2)
+    assert form.value() == Fraction(1, 3)
+    assert form == LinearForm({"x": Fraction(1, 2)}, Fraction(1, 3))
+
+
+@pytest.mark.parametrize("node, coef, const", [
+    (BinaryOp("/", Variable("x"), Literal(-4)), Fraction(-1, 4), 0),
+    (BinaryOp("*", Literal(Fraction(3, 2)), Variable("x", Fraction(2, 3))), 1, 0),
+    (BinaryOp("-", BinaryOp("/", Literal(1), Literal(4)), BinaryOp("/", Variable("x"), Literal(6))), Fraction(-1, 6), Fraction(1, 4)),
+    (BinaryOp("+", Literal(0.5), Variable("x", 2.5)), Fraction(5, 2), Fraction(1, 2)),
+])
+def test_linear_form_rationals(node: Node, coef: Fraction, const: Fraction) -> None:
+    form = linear_form(node)
+    assert form.den > 0
+    assert form.coef("x") == coef
+    assert form.value() == const
@@ -1,3 +1,11 @@
+import argparse
+import csv
+import json
+import sys
+from itertools import tee
+from typing import Iterator, List, Optional, Sequence, TextIO, Tuple
+from pipeline import Result, solve_stream
+
 # TODO: distributive when x multiplies x -> x(a + x)
 # TODO: Deve ter uma forma melhor de em BinaryOp.__str__() printar não comutatividade
 
@@ -30,9 +38,100 @@
 # portanto o solver prescisa analizar a equação e verificar se ela realmente é linear
 
 
-def main():
-    ...
+FORMATS = ("text", "json", "csv")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    arguments = argparse.ArgumentParser(
+        description="Solve one linear equation per line, streaming the solutions to stdout",
+    )
+    arguments.add_argument("files", nargs="*", default=["-"], help="input files, '-' for stdin (default)")
+    arguments.add_argument("-j", "--jobs", type=int, default=1, help="worker processes (0 = one per CPU)")
+    arguments.add_argument("-f", "--format", choices=FORMATS, default="text", help="output format")
+    arguments.add_argument("--chunksize", type=int, default=256, help="equations sent to a worker at a time")
+    arguments.add_argument("--cache", metavar="PATH", help="persistent answer cache (SQLite), shared across runs")
+    args = arguments.parse_args(argv)
+
+    if args.jobs < 0:
+        arguments.error("--jobs must be at least 0")
+    if args.chunksize < 1:
+        arguments.error("--chunksize must be at least 1")
+
+    # Uma cópia das linhas vai para o solver e a outra acompanha os resultados;
+    # o tee só guarda as linhas ainda em processamento
+    unreadable: List[str] = []
+    lines, texts = tee(read_lines(args.files, unreadable))
+    results = solve_stream((text for _, text in texts), args.jobs or None, args.chunksize, args.cache)
+
+    failed = False
+    write = _WRITERS[args.format](sys.stdout)
+    for (line, text), result in zip(lines, results):
+        failed |= isinstance(result, Exception)
+        write(line, text, result)
+
+    return 1 if failed or unreadable else 0
+
+
+def read_lines(paths: Sequence[str], failed: Optional[List[str]] = None) -> Iterator[Tuple[int, str]]:
+    # (número da linha, equação), pulando linhas em branco; a numeração é
+    # contínua entre os arquivos. Bytes que não são UTF-8 válido viram U+FFFD e um
+    # erro só daquela linha; um arquivo que não pode ser lido é avisado no stderr,
+    # anotado em `failed`, e a leitura segue no próximo
+    number = 0
+    for path in paths:
+        try:
+            file = sys.stdin if path == "-" else open(path, encoding="utf-8", errors="replace")
+            try:
+                for line in file:
+                    number += 1
+                    text = line.strip()
+                    if text:
+                        yield number, text
+            finally:
+                if file is not sys.stdin:
+                    file.close()
+        except OSError as e:
+            print(f"error: cannot read {path}: {e.strerror or e}", file=sys.stderr)
+            if failed is not None:
+                failed.append(path)
+
+
+def _text_writer(output: TextIO):
+    def write(line: int, text: str, result: Result) -> None:
+        if isinstance(result, Exception):
+            output.write(f"{line}: error: {result}\n")
+        else:
+            output.write(f"{line}: {result}\n")
+    return write
+
+
+def _json_writer(output: TextIO):
+    # JSON Lines: um objeto por equação
+    def write(line: int, text: str, result: Result) -> None:
+        record = {"line": line, "equation": text}
+        if isinstance(result, Exception):
+            record["error"] = str(result)
+        else:
+            record["variable"] = result.left.name  # type: ignore
+            record["value"] = str(result.right.value)  # type: ignore
+        output.write(json.dumps(record) + "\n")
+    return write
+
+
+def _csv_writer(output: TextIO):
+    writer = csv.writer(output, lineterminator="\n")
+    writer.writerow(["line", "equation", "variable", "value", "error"])
+
+    def write(line: int, text: str, result: Result) -> None:
+        if isinstance(result, Exception):
+            writer.writerow([line, text, "", "", str(result)])
+        else:
+            writer.writerow([line, text, result.left.name, str(result.right.value), ""])  # type: ignore
+    return write
+
+
+_WRITERS = {"text": _text_writer, "json": _json_writer, "csv": _csv_writer}
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,80 @@
+import io
+import json
+import pytest
+from main import main, read_lines
+
+EQUATIONS = "2x = 10\n\nx @ 1\n1/x = 4\n"
+
+
+@pytest.mark.parametrize("fmt, expected", [
+    ("text", ["1: x = 5", "3: error: Invalid character: @", "4: x = 1/4"]),
+    ("csv", [
+        "line,equation,variable,value,error",
+        "1,2x = 10,x,5,",
+        "3,x @ 1,,,Invalid character: @",
+        "4,1/x = 4,x,1/4,",
+    ]),
+])
+def test_main_formats(tmp_path, capsys, fmt: str, expected) -> None:
+    path = tmp_path / "equations.txt"
+    path.write_text(EQUATIONS)
+
+    assert main([str(path), "--format", fmt]) == 1
+    assert capsys.readouterr().out.splitlines() == expected
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_main_json_jobs(tmp_path, capsys, jobs: str) -> None:
+    path = tmp_path / "equations.txt"
+    path.write_text("".join(f"{i}x = {i * i}\n" for i in range(1, 50)))
+
+    assert main([str(path), "-f", "json", "-j", jobs, "--chunksize", "4"]) == 0
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert records == [
+        {"line": i, "equation": f"{i}x = {i * i}", "variable": "x", "value": str(i)}
+        for i in range(1, 50)
+    ]
+
+
+def test_main_stdin(monkeypatch, capsys) -> None:
+    monkeypatch.setattr("sys.stdin", io.StringIO("x + 1 = 3\n"))
+    assert main([]) == 0
+    assert capsys.readouterr().out == "1: x = 2\n"
+
+
+def test_main_cache(tmp_path, capsys) -> None:
+    path = tmp_path / "equations.txt"
+    path.write_text(EQUATIONS)
+    cache = str(tmp_path / "answers.db")
+
+    for _ in range(2):
+        assert main([str(path), "--cache", cache]) == 1
+        assert capsys.readouterr().out.splitlines() == ["1: x = 5", "3: error: Invalid character: @", "4: x = 1/4"]
+    assert (tmp_path / "answers.db").exists()
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_main_invalid_utf8(tmp_path, capsys, jobs: str) -> None:
+    path = tmp_path / "equations.txt"
+    path.write_bytes(b"2x = 4\n\xff = 1\n3x = 9\n")
+
+    assert main([str(path), "-j", jobs]) == 1
+    assert capsys.readouterr().out.splitlines() == ["1: x = 2", "2: error: Invalid character: \ufffd", "3: x = 3"]
+
+
+def test_main_missing_file(tmp_path, capsys) -> None:
+    path = tmp_path / "equations.txt"
+    path.write_text("2x = 4\n")
+    missing = tmp_path / "missing.txt"
+
+    assert main([str(missing), str(path)]) == 1
+    captured = capsys.readouterr()
+    assert captured.out == "1: x = 2\n"
+    assert captured.err == f"error: cannot read {missing}: No such file or directory\n"
+
+
+def test_read_lines_numbers_across_files(tmp_path) -> None:
+    first, second = tmp_path / "a.txt", tmp_path / "b.txt"
+    first.write_text("x = 1\n\n")
+    second.write_text("x = 2\n")
+    assert list(read_lines([str(first), str(second)])) == [(1, "x = 1"), (3, "x = 2")]
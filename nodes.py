@@ -1,27 +1,37 @@
 from dataclasses import dataclass
 from fractions import Fraction
-from typing import Union, Literal as Literal_t
+from typing import Dict, Iterator, List, TextIO, Tuple, Union, Literal as Literal_t
 
 
-@dataclass
+# Os nós usam __slots__ em vez de um __dict__ por instância: em lotes grandes
+# a árvore é o maior custo de memória. São imutáveis e hasheáveis, então
+# subárvores iguais podem ser compartilhadas (ver Interner)
+
+
+@dataclass(slots=True, frozen=True)
 class Node:
     def __str__(self) -> str:
         raise NotImplementedError()
 
-    def __eq__(self, other: object) -> bool:
-        return type(self) == type(other) and self.__dict__ == other.__dict__
 
-
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Root(Node):
     left: Node
     right: Node
 
     def __str__(self) -> str:
-        return f"{self.left} = {self.right}"
+        return to_string(self)
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is not Root:
+            return NotImplemented
+        return _equal(self, other)
+
+    def __hash__(self) -> int:
+        return _hash(self)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Literal(Node):
     value: Union[int, float, Fraction]
 
@@ -34,13 +44,15 @@ class Literal(Node):
         return str(self.value)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Variable(Node):
     name: str = "x"
     coef: Union[int, float, Fraction] = 1
 
     def __post_init__(self):
-        self.coef = Fraction(self.coef)
+        # int e Fraction ficam como estão (inteiros só viram Fraction numa divisão)
+        if type(self.coef) is not int and not isinstance(self.coef, Fraction):
+            object.__setattr__(self, "coef", Fraction(self.coef))
 
     def __str__(self) -> str:
         if self.coef < 0:
@@ -56,25 +68,162 @@ _PRECEDENCE = {
 }
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class BinaryOp(Node):
     op: Literal_t["+", "-", "*", "/"]
     left: Node
     right: Node
 
     def __str__(self) -> str:
-        def wrap(child: Node, is_left: bool) -> str:
-            if not isinstance(child, BinaryOp):
-                return str(child)
-
-            my_prec = _PRECEDENCE[self.op]
-            child_prec = _PRECEDENCE[child.op]
+        return to_string(self)
 
-            if child_prec < my_prec:
-                return f"({child})"
-            if child_prec == my_prec:
-                if self.op in {"-", "/"} and not is_left:
-                    return f"({child})"
-            return str(child)
-
-        return f"{wrap(self.left, True)} {self.op} {wrap(self.right, False)}"
+    def __eq__(self, other: object) -> bool:
+        if type(other) is not BinaryOp:
+            return NotImplemented
+        return _equal(self, other)
+
+    def __hash__(self) -> int:
+        return _hash(self)
+
+
+# O __eq__ e o __hash__ gerados pelo dataclass descem na árvore por recursão e
+# estouram o limite em cadeias longas; nos nós internos eles usam pilhas explícitas
+
+
+def _equal(left: Node, right: Node) -> bool:
+    stack: List[Tuple[Node, Node]] = [(left, right)]
+    while stack:
+        left, right = stack.pop()
+        if left is right:
+            continue
+        if type(left) is not type(right):
+            return False
+        if isinstance(left, BinaryOp):
+            if left.op != right.op:  # type: ignore
+                return False
+        elif not isinstance(left, Root):
+            if left != right:
+                return False
+            continue
+        stack.append((left.right, right.right))  # type: ignore
+        stack.append((left.left, right.left))  # type: ignore
+    return True
+
+
+def _hash(node: Node) -> int:
+    # Pós-ordem: o hash de um nó interno combina o operador e os hashes dos filhos.
+    # Subárvores compartilhadas (Interner) são calculadas uma vez só
+    hashes: Dict[int, int] = {}
+    stack: List[Tuple[Node, bool]] = [(node, False)]
+
+    while stack:
+        current, visited = stack.pop()
+        key = id(current)
+        if key in hashes:
+            continue
+
+        if isinstance(current, BinaryOp):
+            op = current.op
+        elif isinstance(current, Root):
+            op = "="
+        else:
+            hashes[key] = hash(current)
+            continue
+
+        if not visited:
+            stack.append((current, True))
+            stack.append((current.right, False))
+            stack.append((current.left, False))
+        else:
+            hashes[key] = hash((op, hashes[id(current.left)], hashes[id(current.right)]))
+
+    return hashes[id(node)]
+
+
+def to_string(node: Node) -> str:
+    return "".join(_fragments(node))
+
+
+def write(node: Node, file: TextIO, buffer_size: int = 4096) -> None:
+    # Escreve a expressão no arquivo em blocos de até `buffer_size` fragmentos,
+    # sem montar a string inteira em memória
+    buffer: List[str] = []
+    for fragment in _fragments(node):
+        buffer.append(fragment)
+        if len(buffer) >= buffer_size:
+            file.write("".join(buffer))
+            buffer.clear()
+    if buffer:
+        file.write("".join(buffer))
+
+
+def _fragments(node: Node) -> Iterator[str]:
+    # Percurso com pilha explícita: cada fragmento é gerado uma única vez, em
+    # ordem, então o custo é linear mesmo em cadeias longas e não há recursão.
+    # A pilha guarda nós ainda por expandir e strings prontas, em ordem inversa.
+    # Um filho ganha parênteses se tem precedência menor que o pai, ou igual
+    # quando está à direita de '-' ou '/'
+    stack: List[Union[Node, str]] = [node]
+
+    while stack:
+        item = stack.pop()
+
+        if isinstance(item, str):
+            yield item
+        elif isinstance(item, BinaryOp):
+            precedence = _PRECEDENCE[item.op]
+            left, right = item.left, item.right
+
+            if isinstance(right, BinaryOp) and (
+                _PRECEDENCE[right.op] < precedence
+                or (_PRECEDENCE[right.op] == precedence and item.op in {"-", "/"})
+            ):
+                stack.extend((")", right, "("))
+            else:
+                stack.append(right)
+
+            stack.append(f" {item.op} ")
+
+            if isinstance(left, BinaryOp) and _PRECEDENCE[left.op] < precedence:
+                stack.extend((")", left, "("))
+            else:
+                stack.append(left)
+        elif isinstance(item, Root):
+            stack.extend((item.right, " = ", item.left))
+        else:
+            yield str(item)
+
+
+class Interner:
+    # Hash-consing: cada subárvore estruturalmente igual é construída uma única vez.
+    # Como os filhos já são únicos, um BinaryOp é identificado por (op, id(left), id(right))
+    # sem precisar hashear a subárvore inteira; a tabela mantém os nós vivos
+
+    def __init__(self):
+        self._literals: Dict[Tuple[type, Union[int, float, Fraction]], Literal] = {}
+        self._variables: Dict[Tuple[str, Fraction], Variable] = {}
+        self._binary_ops: Dict[Tuple[str, int, int], BinaryOp] = {}
+
+    def __len__(self) -> int:
+        return len(self._literals) + len(self._variables) + len(self._binary_ops)
+
+    def literal(self, value: Union[int, float, Fraction]) -> Literal:
+        key = (type(value), value)
+        node = self._literals.get(key)
+        if node is None:
+            node = self._literals[key] = Literal(value)
+        return node
+
+    def variable(self, name: str = "x", coef: Union[int, float, Fraction] = 1) -> Variable:
+        key = (name, Fraction(coef))
+        node = self._variables.get(key)
+        if node is None:
+            node = self._variables[key] = Variable(name, coef)
+        return node
+
+    def binary(self, op: Literal_t["+", "-", "*", "/"], left: Node, right: Node) -> BinaryOp:
+        key = (op, id(left), id(right))
+        node = self._binary_ops.get(key)
+        if node is None:
+            node = self._binary_ops[key] = BinaryOp(op, left, right)
+        return node
@@ -1,6 +1,8 @@
+import io
 import pytest
+from dataclasses import FrozenInstanceError
 from fractions import Fraction
-from nodes import Node, Literal, Variable, BinaryOp, Root
+from nodes import Node, Literal, Variable, BinaryOp, Root, Interner, to_string, write
 
 
 @pytest.mark.parametrize("node, expected", [
@@ -19,3 +21,96 @@ from nodes import Node, Literal, Variable, BinaryOp, Root
 ])
 def test_nodes_str(node: Node, expected: str) -> None:
     assert str(node) == expected
+
+
+@pytest.mark.parametrize("node", [
+    Root(Variable(), Literal(1)),
+    Literal(Fraction(1, 2)),
+    Variable("y", 3),
+    BinaryOp("+", Literal(1), Variable()),
+])
+def test_nodes_slots(node: Node) -> None:
+    assert not hasattr(node, "__dict__")
+    # O CPython 3.11 reporta TypeError ao criar atributos em dataclasses frozen com slots
+    with pytest.raises((AttributeError, TypeError)):
+        node.extra = 1  # type: ignore
+
+
+@pytest.mark.parametrize("node, field", [
+    (Root(Variable(), Literal(1)), "left"),
+    (Literal(1), "value"),
+    (Variable("y", 3), "coef"),
+    (BinaryOp("+", Literal(1), Variable()), "op"),
+])
+def test_nodes_frozen(node: Node, field: str) -> None:
+    with pytest.raises(FrozenInstanceError):
+        setattr(node, field, None)
+
+
+@pytest.mark.parametrize("a, b, equal", [
+    (BinaryOp("*", Literal(2), Variable("x", 3)), BinaryOp("*", Literal(2), Variable("x", Fraction(3))), True),
+    (BinaryOp("*", Literal(2), Variable("x", 3)), BinaryOp("/", Literal(2), Variable("x", 3)), False),
+    (Literal(1), Variable("x", 1), False),
+    (Root(Variable("x"), Literal(1)), Root(Variable("x"), Literal(1)), True),
+])
+def test_nodes_eq(a: Node, b: Node, equal: bool) -> None:
+    assert (a == b) is equal
+
+
+def test_nodes_hash() -> None:
+    a = BinaryOp("*", Literal(2), BinaryOp("+", Variable("x", 3), Literal(Fraction(1, 2))))
+    b = BinaryOp("*", Literal(2), BinaryOp("+", Variable("x", Fraction(3)), Literal(Fraction(1, 2))))
+    assert a is not b
+    assert hash(a) == hash(b)
+    assert len({a, b, Root(a, b), Root(b, a)}) == 2
+
+
+def test_interner() -> None:
+    interner = Interner()
+    x = interner.variable("x", 2)
+    one = interner.literal(Fraction(1))
+
+    assert interner.variable("x", Fraction(2)) is x
+    assert interner.literal(Fraction(1)) is one
+    assert interner.binary("+", x, one) is interner.binary("+", x, one)
+    assert interner.binary("+", x, one) is not interner.binary("-", x, one)
+    assert interner.binary("+", x, one) == BinaryOp("+", Variable("x", 2), Literal(1))
+    assert len(interner) == 4
+
+
+@pytest.mark.parametrize("node, expected", [
+    (BinaryOp("-", Literal(1), BinaryOp("-", Literal(2), Literal(3))), "1 - (2 - 3)"),
+    (BinaryOp("-", BinaryOp("-", Literal(1), Literal(2)), Literal(3)), "1 - 2 - 3"),
+    (BinaryOp("/", Variable("x"), BinaryOp("*", Literal(2), Literal(3))), "x / (2 * 3)"),
+    (BinaryOp("*", BinaryOp("+", Variable("x"), Literal(1)), BinaryOp("/", Literal(4), Variable("y", -2))),
+     "(x + 1) * 4 / (-2y)"),
+    (Root(Variable("x", Fraction(1, 2)), Literal(-3)), "1/2x = (-3)"),
+])
+def test_to_string_and_write(node: Node, expected: str) -> None:
+    assert to_string(node) == expected
+    file = io.StringIO()
+    write(node, file, buffer_size=2)
+    assert file.getvalue() == expected
+
+
+def test_str_long_chain() -> None:
+    node: Node = Variable("x")
+    for i in range(1, 50000):
+        node = BinaryOp("+", node, Literal(1))
+    text = str(Root(node, Literal(0)))
+    assert text == "x" + " + 1" * 49999 + " = 0"
+
+
+def test_hash_and_eq_long_chain() -> None:
+    def chain(last: int) -> Root:
+        node: Node = Variable("x")
+        for i in range(1, 50000):
+            node = BinaryOp("+", node, Literal(1))
+        return Root(node, Literal(last))
+
+    first, second = chain(0), chain(0)
+    assert first is not second
+    assert hash(first) == hash(second)
+    assert first == second
+    assert first != chain(1)
+    assert {first: "a"}[second] == "a"
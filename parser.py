@@ -1,7 +1,7 @@
 from fractions import Fraction
-from typing import List, Tuple
+from typing import Iterable, List, Optional, Sequence, Union
 from lexer import Token, TokenType
-from nodes import Node, Root, Literal, Variable, BinaryOp
+from nodes import Node, Root, Literal, Variable, BinaryOp, Interner
 
 """
 <equation>   = <expression> EQUAL <expression>
@@ -15,133 +15,215 @@ from nodes import Node, Root, Literal, Variable, BinaryOp
 <foo>        = <number>
              | [ <number> ] <variable>
 
-<number>     = DOT DIGIT {DIGIT}
+<number>     = NUMBER
+             | DOT DIGIT {DIGIT}
              | DIGIT {DIGIT} [ DOT DIGIT {DIGIT} ]
 
-<variable>   = LETTER
+<variable>   = IDENT
+             | LETTER
 """
 
+_ADDITIVE = frozenset({TokenType.PLUS, TokenType.MINUS})
+_BINARY = frozenset({TokenType.PLUS, TokenType.MINUS, TokenType.MULTIPLY, TokenType.DIVIDE})
+_PRECEDENCE = {"+": 1, "-": 1, "*": 2, "/": 2}
+_NUMERIC = frozenset({TokenType.NUMBER, TokenType.DIGIT, TokenType.DOT})
+_ALPHA = frozenset({TokenType.IDENT, TokenType.LETTER})
 
-def parser(tokens: List[Token]) -> Root:
-    if len(tokens) == 0:
-        raise ValueError("Empty tokens.")
 
-    if tokens.count(Token(TokenType.EQUAL, "=")) != 1:
-        raise ValueError("The equation must have exactly one '=' sign.")
+def parser(tokens: Sequence[Token], interner: Optional[Interner] = None) -> Root:
+    return Parser(tokens, interner).parse()
 
-    i = tokens.index(Token(TokenType.EQUAL, "="))
 
-    left, _ = parse_expr(tokens[:i], 0)
-    right, _ = parse_expr(tokens[i+1:], 0)
+def parse_stream(tokens: Iterable[Token], interner: Optional[Interner] = None) -> Root:
+    return StreamParser(tokens, interner).parse()
 
-    return Root(left, right)
 
+def parse_number(text: str) -> Union[int, Fraction]:
+    # Inteiros ficam em int, sem passar pelo parser de strings de Fraction
+    if "." in text:
+        return Fraction(text)
+    return int(text)
 
-def parse_expr(tokens: List[Token], i: int) -> Tuple[Node, int]:
-    node, i = parse_term(tokens, i)
-    while i < len(tokens) and tokens[i].type in {TokenType.PLUS, TokenType.MINUS}:
-        op = tokens[i].value
-        right, i = parse_term(tokens, i + 1)
-        node = BinaryOp(op, node, right) # type: ignore
-    return node, i
 
+class Parser:
+    # Um único cursor sobre a sequência de tokens compartilhada: nada é fatiado
+    # e o '=' é encontrado durante a mesma passada
 
-def parse_term(tokens: List[Token], i: int) -> Tuple[Node, int]:
-    node, i = parse_factor(tokens, i)
-    while i < len(tokens) and tokens[i].type in {TokenType.MULTIPLY, TokenType.DIVIDE}:
-        op = tokens[i].value
-        right, i = parse_factor(tokens, i + 1)
-        node = BinaryOp(op, node, right) # type: ignore
-    return node, i
+    def __init__(self, tokens: Sequence[Token], interner: Optional[Interner] = None):
+        self._tokens = tokens
+        self._size = len(tokens)
+        self._i = 0
+        self.current: Optional[Token] = tokens[0] if self._size else None
+        self._use(interner)
 
-
-def parse_factor(tokens: List[Token], i: int) -> Tuple[Node, int]:
-    sign = 1
-
-    if tokens[i].type in {TokenType.PLUS, TokenType.MINUS}:
-        sign = 1 if tokens[i].type == TokenType.PLUS else -1
-        i += 1
-
-    if tokens[i].type in {TokenType.DIGIT, TokenType.DOT, TokenType.LETTER}:
-        node, i = parse_foo(tokens, i)
-    elif tokens[i].type == TokenType.LPAREN:
-        node, i = parse_expr(tokens, i + 1)
-        if i >= len(tokens) or tokens[i].type != TokenType.RPAREN:
-            raise ValueError("Expected ')'")
-        i += 1
-    else:
-        raise ValueError(f"Unexpected token: {tokens[i]}")
-
-    if sign == -1:
-        if isinstance(node, Literal):
-            node = Literal(sign * node.value)
-        elif isinstance(node, Variable):
-            node = Variable(name=node.name, coef=sign * node.coef)
+    def _use(self, interner: Optional[Interner]) -> None:
+        # Com um Interner, subárvores iguais (na equação ou no lote) viram o mesmo objeto
+        if interner is None:
+            self._literal, self._variable, self._binary = Literal, Variable, BinaryOp
         else:
-            node = BinaryOp("*", Literal(Fraction(sign)), node)
-
-    return node, i
-
-
-def parse_foo(tokens: List[Token], i: int) -> Tuple[Node, int]:
-    if tokens[i].type in {TokenType.DIGIT, TokenType.DOT}:
-        literal, i = parse_num(tokens, i)
-
-        if i < len(tokens) and tokens[i].type == TokenType.LETTER:
-            variable, i = parse_var(tokens, i)
-            return Variable(variable.name, literal.value), i
-
-        return literal, i
-
-    if i < len(tokens) and tokens[i].type == TokenType.LETTER:
-        variable, i = parse_var(tokens, i)
-        return variable, i
-
-    raise ValueError(f"Unexpected token: {tokens[i]}")
-
-
-def parse_num(tokens: List[Token], i: int) -> Tuple[Literal, int]:
-    digits = ""
-
-    if i < len(tokens) and tokens[i].type == TokenType.DOT:
-        digits += tokens[i].value
-        i += 1
-
-        while len(tokens) > i and tokens[i].type == TokenType.DIGIT:
-            digits += tokens[i].value
-            i += 1
-
-        if digits in {".", ""}:
+            self._literal, self._variable, self._binary = interner.literal, interner.variable, interner.binary
+
+    def advance(self) -> None:
+        self._i += 1
+        self.current = self._tokens[self._i] if self._i < self._size else None
+
+    def parse(self) -> Root:
+        if self.current is None:
+            raise ValueError("Empty tokens.")
+
+        left = self.expr()
+        if self.current is None:
+            raise ValueError("The equation must have exactly one '=' sign.")
+        if self.current.type != TokenType.EQUAL:
+            raise ValueError(f"Unexpected token: {self.current}")
+        self.advance()
+
+        right = self.expr()
+        if self.current is not None:
+            if self.current.type == TokenType.EQUAL:
+                raise ValueError("The equation must have exactly one '=' sign.")
+            raise ValueError(f"Unexpected token: {self.current}")
+
+        return Root(left, right)
+
+    def expr(self) -> Node:
+        # Shunting-yard com pilhas explícitas: nem o aninhamento de parênteses
+        # nem cadeias longas de operadores consomem a pilha do Python.
+        # Em `operators`, as strings são operadores binários e os inteiros marcam
+        # um '(' aberto junto com o sinal que o precede
+        operands: List[Node] = []
+        operators: List[Union[str, int]] = []
+        depth = 0
+
+        while True:
+            token = self.expect()
+            sign = 1
+
+            if token.type in _ADDITIVE:
+                sign = 1 if token.type == TokenType.PLUS else -1
+                self.advance()
+                token = self.expect()
+
+            if token.type == TokenType.LPAREN:
+                operators.append(sign)
+                depth += 1
+                self.advance()
+                continue
+
+            operands.append(self.foo(token, sign))
+
+            while True:
+                token = self.current
+
+                if token is not None and token.type in _BINARY:
+                    op = token.value
+                    precedence = _PRECEDENCE[op]
+                    while (operators and isinstance(operators[-1], str)
+                           and _PRECEDENCE[operators[-1]] >= precedence):
+                        self._reduce(operands, operators.pop())  # type: ignore
+                    operators.append(op)
+                    self.advance()
+                    break
+
+                if token is not None and token.type == TokenType.RPAREN and depth > 0:
+                    while isinstance(operators[-1], str):
+                        self._reduce(operands, operators.pop())  # type: ignore
+                    if operators.pop() == -1:
+                        operands.append(self._negate(operands.pop()))
+                    depth -= 1
+                    self.advance()
+                    continue
+
+                if depth > 0:
+                    raise ValueError("Expected ')'")
+
+                while operators:
+                    self._reduce(operands, operators.pop())  # type: ignore
+                return operands[0]
+
+    def foo(self, token: Token, sign: int) -> Node:
+        if token.type in _NUMERIC:
+            value = self.number()
+            if sign == -1:
+                value = -value
+            if self.current is not None and self.current.type in _ALPHA:
+                return self._variable(self.variable(), value)
+            return self._literal(value)
+
+        if token.type in _ALPHA:
+            return self._variable(self.variable(), sign)
+
+        raise ValueError(f"Unexpected token: {token}")
+
+    def number(self) -> Union[int, Fraction]:
+        token = self.expect()
+        if token.type == TokenType.NUMBER:
+            self.advance()
+            return parse_number(token.value)
+
+        # Números vindos de tokens de um caractere (DIGIT/DOT) são colados aqui
+        digits = []
+        while self.current is not None and self.current.type == TokenType.DIGIT:
+            digits.append(self.current.value)
+            self.advance()
+
+        if self.current is not None and self.current.type == TokenType.DOT:
+            digits.append(".")
+            self.advance()
+            while self.current is not None and self.current.type == TokenType.DIGIT:
+                digits.append(self.current.value)
+                self.advance()
+
+        number = "".join(digits)
+        if number in {"", "."}:
             raise ValueError("Invalid number")
 
-        return Literal(Fraction(digits)), i
-
-    while i < len(tokens) and tokens[i].type == TokenType.DIGIT:
-        digits += tokens[i].value
-        i += 1
-
-    if i < len(tokens) and tokens[i].type == TokenType.DOT:
-        digits += tokens[i].value
-        i += 1
+        return parse_number(number)
 
-        while len(tokens) > i and tokens[i].type == TokenType.DIGIT:
-            digits += tokens[i].value
-            i += 1
+    def variable(self) -> str:
+        token = self.expect()
+        name = token.value
+        self.advance()
 
-    if digits in {"", "."}:
-        raise ValueError("Ivalid Number")
+        if token.type == TokenType.LETTER:
+            while self.current is not None and self.current.type == TokenType.LETTER:
+                name += self.current.value
+                self.advance()
 
-    return Literal(Fraction(digits)), i
+        if len(name) != 1:
+            raise ValueError(f"Variables must have exactly only one letter")
 
+        return name
 
-def parse_var(tokens: List[Token], i: int) -> Tuple[Variable, int]:
-    letters = ""
+    def expect(self) -> Token:
+        if self.current is None:
+            raise ValueError("Unexpected end of input")
+        return self.current
 
-    while i < len(tokens) and tokens[i].type == TokenType.LETTER:
-        letters += tokens[i].value
-        i += 1
+    def _reduce(self, operands: List[Node], op: str) -> None:
+        right = operands.pop()
+        operands.append(self._binary(op, operands.pop(), right))  # type: ignore
 
-    if len(letters) != 1:
-        raise ValueError(f"Variables must have exactly only one letter")
-
-    return Variable(letters), i
\ No newline at end of file
+    def _negate(self, node: Node) -> Node:
+        if isinstance(node, Literal):
+            return self._literal(-node.value)
+        if isinstance(node, Variable):
+            return self._variable(node.name, -node.coef)
+        return self._binary("*", self._literal(Fraction(-1)), node)
+
+
+class StreamParser(Parser):
+    # Consome um iterador de tokens com um único token de lookahead,
+    # sem nunca materializar a lista inteira
+
+    def __init__(self, tokens: Iterable[Token], interner: Optional[Interner] = None):
+        self._next = iter(tokens).__next__
+        self.current = None
+        self.advance()
+        self._use(interner)
+
+    def advance(self) -> None:
+        try:
+            self.current = self._next()
+        except StopIteration:
+            self.current = None
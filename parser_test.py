@@ -1,9 +1,10 @@
+import io
 import re
 import pytest
-from lexer import Token, TokenType
+from lexer import Token, TokenType, iter_tokens, lexer
 from typing import List
-from nodes import Node, Root, Literal, Variable, BinaryOp
-from parser import parser
+from nodes import Node, Root, Literal, Variable, BinaryOp, Interner
+from parser import parse_number, parse_stream, parser
 from fractions import Fraction
 
 
@@ -405,3 +406,119 @@ def test_parser(tokens: List[Token], eq: Node) -> None:
 def test_parser_invalid(tokens: List[Token], error_msg: str):
     with pytest.raises(ValueError, match=re.escape(error_msg)):
         parser(tokens)
+
+
+@pytest.mark.parametrize("text, eq", [
+    ("12.5y = 100", Root(Variable("y", Fraction(25, 2)), Literal(Fraction(100)))),
+    ("-.5 + x = 3.", Root(BinaryOp("+", Literal(Fraction(-1, 2)), Variable("x")), Literal(Fraction(3)))),
+])
+def test_parser_lexed(text: str, eq: Node) -> None:
+    assert parser(lexer(text)) == eq
+
+
+@pytest.mark.parametrize("text, error_msg", [
+    ("2 3 = x", "Unexpected token: Token(NUMBER, '3')"),
+    ("1 . 5 = x", "Unexpected token: Token(DOT, '.')"),
+    ("2x = 1 0", "Unexpected token: Token(NUMBER, '0')"),
+])
+def test_parser_lexed_split_number(text: str, error_msg: str) -> None:
+    # Um número separado por espaço não é mais juntado (antes "2 3" valia 23)
+    with pytest.raises(ValueError, match=re.escape(error_msg)):
+        parser(lexer(text))
+
+
+def test_parser_lexed_long_variable() -> None:
+    with pytest.raises(ValueError, match="Variables must have exactly only one letter"):
+        parser(lexer("2 * ab = 4"))
+
+
+@pytest.mark.parametrize("text", [
+    "5x / 2 = 10",
+    "-3m + 2 = 5 * (-2)",
+    "l = (1 + 2) / ((3 - 4) * (5 - 2))",
+    "2 + (-(-3 + 5 * x)) = 11",
+    "-(2) + .5 = +x",
+    "12.5y = 100",
+])
+def test_parse_stream(text: str) -> None:
+    assert parse_stream(iter_tokens(io.StringIO(text), 2)) == parser(lexer(text))
+
+
+@pytest.mark.parametrize("text, error_msg", [
+    ("2 + 2", "The equation must have exactly one '=' sign."),
+    ("1 = 2 = 3", "The equation must have exactly one '=' sign."),
+    ("2 + (3 * 4 = 14", "Expected ')'"),
+    ("2 * ab = 4", "Variables must have exactly only one letter"),
+    ("* 3 = 3", "Unexpected token: Token(MULTIPLY, '*')"),
+    ("--x = 1", "Unexpected token: Token(MINUS, '-')"),
+    (". = 1", "Invalid number"),
+    ("2 + = 1", "Unexpected token: Token(EQUAL, '=')"),
+    ("x = 2 +", "Unexpected end of input"),
+    ("x = 2)", "Unexpected token: Token(RPAREN, ')')"),
+    # Sobra no lado esquerdo é reportada como no direito, não como '=' faltando
+    ("2(x+1) = 4", "Unexpected token: Token(LPAREN, '(')"),
+    ("1e3 = x", "Unexpected token: Token(NUMBER, '3')"),
+    ("2 3 = x", "Unexpected token: Token(NUMBER, '3')"),
+])
+def test_parse_stream_invalid(text: str, error_msg: str) -> None:
+    with pytest.raises(ValueError, match=re.escape(error_msg)):
+        parse_stream(iter_tokens(text))
+
+
+def test_parse_stream_empty() -> None:
+    with pytest.raises(ValueError, match="Empty tokens"):
+        parse_stream([])
+
+
+def test_parser_deep_nesting() -> None:
+    depth = 20000
+    eq = parser(lexer("(" * depth + "x" + ")" * depth + " = -(2)"))
+    assert eq.left == Variable("x")
+    assert eq.right == Literal(Fraction(-2))
+
+    with pytest.raises(ValueError, match=re.escape("Expected ')'")):
+        parser(lexer("(" * depth + "x" + ")" * (depth - 1) + " = 1"))
+
+
+def test_parser_long_chain() -> None:
+    eq = parser(lexer(" + ".join(["1"] * 20000) + " = x"))
+    node = eq.left
+    for _ in range(19999):
+        assert isinstance(node, BinaryOp) and node.op == "+"
+        assert node.right == Literal(Fraction(1))
+        node = node.left
+    assert node == Literal(Fraction(1))
+
+
+def test_parser_hash_consing() -> None:
+    interner = Interner()
+    eq = parser(lexer("(x + 2) * 3 + (x + 2) * 5 = (x + 2)"), interner)
+
+    assert eq.left.left.left is eq.left.right.left
+    assert eq.left.left.left is eq.right
+    assert eq == parser(lexer("(x + 2) * 3 + (x + 2) * 5 = (x + 2)"))
+
+    # O mesmo Interner compartilha subárvores entre equações
+    other = parse_stream(iter_tokens("x + 2 = -(x + 2)"), interner)
+    assert other.left is eq.right
+    assert other.right.right is eq.right
+
+
+@pytest.mark.parametrize("text, value", [
+    ("42", 42),
+    ("007", 7),
+    ("2.5", Fraction(5, 2)),
+    (".25", Fraction(1, 4)),
+    ("3.", Fraction(3)),
+])
+def test_parse_number(text: str, value) -> None:
+    number = parse_number(text)
+    assert number == value
+    assert type(number) is (Fraction if "." in text else int)
+
+
+def test_parser_keeps_integer_literals() -> None:
+    eq = parser(lexer("3x + 4 = 2.5"))
+    assert type(eq.left.left.coef) is int  # type: ignore
+    assert type(eq.left.right.value) is int  # type: ignore
+    assert eq.right == Literal(Fraction(5, 2))
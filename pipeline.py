@@ -0,0 +1,199 @@
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import TYPE_CHECKING, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from lexer import lexer
+from parser import parser
+from solver import solver
+from linear import LinearForm
+from nodes import Node, Root, Interner
+import instrument
+
+if TYPE_CHECKING:
+    from cache import DiskCache, SolveCache
+
+
+Result = Union[Root, Exception]
+
+# Erros esperados de uma equação inválida, reportados por item em vez de abortar o lote
+ERRORS = (ValueError, ArithmeticError)
+
+# Equações por Interner em solve_many(hash_consing=True)
+HASH_CONSING_SCOPE = 4096
+
+
+def solve(text: str) -> Root:
+    stats = instrument.active
+    if stats is None:
+        return solver(parser(lexer(text)))
+    return _solve_instrumented(text, stats)
+
+
+def _solve_instrumented(text: str, stats: instrument.Stats) -> Root:
+    clock = time.perf_counter
+    stats.count("equations")
+    stage = "lex"
+    start = clock()
+    try:
+        tokens = lexer(text)
+        lexed = clock()
+        stats.time("lex", lexed - start)
+        stats.count("tokens", len(tokens))
+
+        stage = "parse"
+        tree = parser(tokens)
+        parsed = clock()
+        stats.time("parse", parsed - lexed)
+
+        nodes, depth, operators = instrument.tree_shape(tree)
+        stats.count("nodes", nodes)
+        for op, count in operators.items():
+            stats.count(f"nodes.{op}", count)
+        stats.maximum("depth", depth)
+
+        stage = "solve"
+        parsed = clock()
+        result = solver(tree)
+        stats.time("solve", clock() - parsed)
+        return result
+    except ERRORS as e:
+        stats.count(f"errors.{stage}.{type(e).__name__}")
+        raise
+    finally:
+        stats.time("total", clock() - start)
+
+
+def solve_many(
+    texts: Iterable[str],
+    cache: Optional[Union["SolveCache", "DiskCache"]] = None,
+    hash_consing: bool = False,
+) -> List[Result]:
+    results: List[Result] = []
+    append = results.append
+    solve_one = solve
+
+    if cache is not None:
+        solve_one = cache.solve
+    elif hash_consing:
+        # Subárvores repetidas são construídas e reduzidas uma vez só. O Interner e
+        # o memo guardam tudo o que já viram, então são trocados a cada
+        # HASH_CONSING_SCOPE equações: a memória depende desse escopo, não do lote
+        interner = Interner()
+        memo: Dict[int, Tuple[Node, LinearForm]] = {}
+        solved = 0
+
+        def solve_one(text: str) -> Root:
+            nonlocal interner, memo, solved
+            if solved == HASH_CONSING_SCOPE:
+                interner, memo, solved = Interner(), {}, 0
+            solved += 1
+            return solver(parser(lexer(text), interner), memo)
+
+    for text in texts:
+        try:
+            append(solve_one(text))
+        except ERRORS as e:
+            append(e)
+
+    return results
+
+
+def solve_parallel(
+    texts: Iterable[str],
+    workers: Optional[int] = None,
+    chunksize: int = 256,
+) -> List[Result]:
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1")
+    return list(_solve_pool(texts, workers, chunksize))
+
+
+def solve_stream(
+    texts: Iterable[str],
+    workers: Optional[int] = 1,
+    chunksize: int = 256,
+    cache_path: Optional[str] = None,
+) -> Iterator[Result]:
+    # Resultados na ordem da entrada, entregues à medida que ficam prontos; nem a
+    # entrada nem a saída são materializadas, então a memória não depende do tamanho.
+    # Com cache_path, as respostas passam por uma cache.DiskCache nesse arquivo,
+    # que cada processo abre por conta própria
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1")
+    if workers == 1:
+        if cache_path is not None:
+            return _solve_sequential_cached(texts, cache_path)
+        return _solve_sequential(texts)
+    return _solve_pool(texts, workers, chunksize, cache_path)
+
+
+def _solve_sequential(texts: Iterable[str]) -> Iterator[Result]:
+    for text in texts:
+        try:
+            yield solve(text)
+        except ERRORS as e:
+            yield e
+
+
+def _solve_sequential_cached(texts: Iterable[str], cache_path: str) -> Iterator[Result]:
+    from cache import DiskCache
+
+    with DiskCache(cache_path) as cache:
+        for text in texts:
+            try:
+                yield cache.solve(text)
+            except ERRORS as e:
+                yield e
+
+
+def _solve_pool(
+    texts: Iterable[str],
+    workers: Optional[int],
+    chunksize: int,
+    cache_path: Optional[str] = None,
+) -> Iterator[Result]:
+    # Only the raw strings go to the workers and only the solved Root (or the error)
+    # comes back, the intermediate trees never cross the process boundary
+    workers = workers or os.cpu_count() or 1
+    if cache_path is None:
+        yield from bounded_map(solve_many, ((chunk,) for chunk in _chunks(texts, chunksize)), workers)
+    else:
+        chunks = ((cache_path, chunk) for chunk in _chunks(texts, chunksize))
+        yield from bounded_map(_solve_many_cached, chunks, workers)
+
+
+def bounded_map(
+    function: Callable[..., List[Result]],
+    arguments: Iterable[Tuple],
+    workers: int,
+) -> Iterator[Result]:
+    # function(*args) em cada worker, com os resultados de cada chamada na ordem
+    # de `arguments`. No máximo duas chamadas por worker estão em voo, então uma
+    # entrada enorme nunca é submetida (nem guardada) de uma vez
+    pending: Deque["Future[List[Result]]"] = deque()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for args in arguments:
+            pending.append(executor.submit(function, *args))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def _solve_many_cached(cache_path: str, texts: List[str]) -> List[Result]:
+    # cache importa pipeline, então a importação fica para a hora do uso
+    from cache import solve_many_cached
+    return solve_many_cached(cache_path, texts)
+
+
+def _chunks(texts: Iterable[str], size: int) -> Iterable[List[str]]:
+    chunk: List[str] = []
+    for text in texts:
+        chunk.append(text)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
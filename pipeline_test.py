@@ -0,0 +1,88 @@
+import pytest
+from fractions import Fraction
+from typing import List
+from linear import equation_form
+from lexer import lexer
+from nodes import Root, Literal, Variable
+from parser import parser
+import pipeline
+from pipeline import solve, solve_many, solve_parallel, solve_stream
+
+
+@pytest.mark.parametrize("text, solution", [
+    ("2k = 10", Root(Variable("k"), Literal(5))),
+    ("2 * (j + 3) = 4j - 2", Root(Variable("j"), Literal(4))),
+    ("-3m + 2 = 5 * (-2)", Root(Variable("m"), Literal(4))),
+])
+def test_solve(text: str, solution: Root) -> None:
+    assert solve(text) == solution
+
+    # A resposta esperada também precisa satisfazer a equação: left - right = 0
+    form = equation_form(parser(lexer(text)))
+    assert form.coef(solution.left.name) * solution.right.value + form.value() == 0  # type: ignore
+
+
+def test_solve_many_keeps_order() -> None:
+    texts = ["2k = 10", "2y = y + 3", "-i = -3"]
+    assert solve_many(texts) == [
+        Root(Variable("k"), Literal(5)),
+        Root(Variable("y"), Literal(3)),
+        Root(Variable("i"), Literal(3)),
+    ]
+
+
+def test_solve_many_reports_errors() -> None:
+    results = solve_many(["2x = 4", "x @ 3 = 7", "", "1 = 2 = 3", "3 * x = 1"])
+
+    assert results[0] == Root(Variable("x"), Literal(2))
+    assert isinstance(results[1], ValueError)
+    assert str(results[1]) == "Invalid character: @"
+    assert isinstance(results[2], ValueError)
+    assert isinstance(results[3], ValueError)
+    assert results[4] == Root(Variable("x"), Literal(Fraction(1, 3)))
+
+
+def test_solve_many_accepts_iterators() -> None:
+    results: List = solve_many(f"{n}x = {2 * n}" for n in range(1, 50))
+    assert results == [Root(Variable("x"), Literal(2))] * 49
+
+
+@pytest.mark.parametrize("workers, chunksize", [(1, 1), (2, 3), (None, 256)])
+def test_solve_parallel_matches_solve_many(workers, chunksize) -> None:
+    texts = [f"{n}x + {n} = {3 * n}" for n in range(1, 20)] + ["x $ 1 = 2", "2x = 8"]
+    results = solve_parallel(texts, workers=workers, chunksize=chunksize)
+
+    assert results[:-2] == [Root(Variable("x"), Literal(2))] * 19
+    assert isinstance(results[-2], ValueError)
+    assert str(results[-2]) == "Invalid character: $"
+    assert results[-1] == Root(Variable("x"), Literal(4))
+
+
+def test_solve_parallel_invalid_chunksize() -> None:
+    with pytest.raises(ValueError, match="chunksize"):
+        solve_parallel(["x = 1"], chunksize=0)
+
+
+@pytest.mark.parametrize("scope", [1, 3, 4096])
+def test_solve_many_hash_consing(monkeypatch, scope: int) -> None:
+    # O escopo do Interner não muda as respostas, só quanto fica guardado
+    monkeypatch.setattr(pipeline, "HASH_CONSING_SCOPE", scope)
+    texts = ["(x + 2) * 3 = (x + 2) * 5", "(x + 2) / 2 = 4", "(x + 2) * x = 1", "x = (x + 2)"] * 2
+    assert [str(r) for r in solve_many(texts, hash_consing=True)] == [str(r) for r in solve_many(texts)]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_solve_stream_is_lazy_and_ordered(workers: int) -> None:
+    consumed = []
+
+    def texts():
+        for i in range(1, 1000):
+            consumed.append(i)
+            yield f"{i}x = {2 * i}"
+
+    results = solve_stream(texts(), workers=workers, chunksize=10)
+    first = next(results)
+    assert first == Root(Variable("x"), Literal(2))
+    # Só uma janela limitada da entrada foi lida antes do primeiro resultado
+    assert len(consumed) < 100
+    assert list(results) == [Root(Variable("x"), Literal(2))] * 998
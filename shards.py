@@ -0,0 +1,72 @@
+import mmap
+import os
+from typing import Iterator, List, Optional, Tuple
+from pipeline import Result, bounded_map, solve_many
+
+
+# Leitura de corpora grandes (uma equação por linha) via mmap: o arquivo é dividido
+# em intervalos de bytes que terminam em fim de linha, e cada intervalo é lido
+# direto do mapeamento, uma linha por vez. Para os workers só vão o caminho e os
+# limites do intervalo; cada um mapeia o arquivo por conta própria
+
+SHARD_SIZE = 1 << 22
+
+
+def shard_ranges(path: str, shard_size: int = SHARD_SIZE) -> List[Tuple[int, int]]:
+    if shard_size < 1:
+        raise ValueError("shard_size must be at least 1")
+
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+
+    ranges: List[Tuple[int, int]] = []
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        start = 0
+        while start < size:
+            # O intervalo vai até o primeiro '\n' depois do tamanho alvo, inclusive
+            newline = data.find(b"\n", min(start + shard_size, size) - 1)
+            end = size if newline == -1 else newline + 1
+            ranges.append((start, end))
+            start = end
+
+    return ranges
+
+
+def iter_lines(path: str, start: int = 0, end: Optional[int] = None) -> Iterator[str]:
+    # Linhas de data[start:end] sem o '\n'; só a linha corrente vira str.
+    # Uma linha em branco é entregue como "" e bytes que não são UTF-8 válido viram
+    # U+FFFD (os dois viram um erro no solver, não no gerador), então o i-ésimo
+    # resultado sempre corresponde à i-ésima linha
+    if os.path.getsize(path) == 0:
+        return
+
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        if end is None:
+            end = len(data)
+        find = data.find
+        while start < end:
+            newline = find(b"\n", start, end)
+            if newline == -1:
+                newline = end
+            yield data[start:newline].decode("utf-8", errors="replace")
+            start = newline + 1
+
+
+def solve_shard(path: str, start: int, end: int) -> List[Result]:
+    return solve_many(iter_lines(path, start, end))
+
+
+def solve_file(path: str, workers: Optional[int] = 1, shard_size: int = SHARD_SIZE) -> Iterator[Result]:
+    # Um resultado por linha, na ordem do arquivo; com mais de um worker, no máximo
+    # dois intervalos por worker estão em voo, então a memória depende de
+    # shard_size e não do tamanho do arquivo
+    ranges = shard_ranges(path, shard_size)
+    if workers == 1:
+        return _solve_sequential(path, ranges)
+    return bounded_map(solve_shard, ((path, start, end) for start, end in ranges), workers or os.cpu_count() or 1)
+
+
+def _solve_sequential(path: str, ranges: List[Tuple[int, int]]) -> Iterator[Result]:
+    for start, end in ranges:
+        yield from solve_shard(path, start, end)
@@ -0,0 +1,68 @@
+import pytest
+from nodes import Root, Literal, Variable
+from pipeline import solve_many
+from shards import iter_lines, shard_ranges, solve_file
+
+LINES = [f"{i}x + {i % 7} = {i * 3}" for i in range(1, 200)] + ["", "x @ 1", "2x = 1"]
+
+
+@pytest.mark.parametrize("shard_size", [1, 7, 64, 1 << 20])
+def test_shard_ranges_end_on_newlines(tmp_path, shard_size: int) -> None:
+    path = tmp_path / "corpus.txt"
+    path.write_text("\n".join(LINES) + "\n")
+    data = path.read_bytes()
+
+    ranges = shard_ranges(str(path), shard_size)
+    assert ranges[0][0] == 0 and ranges[-1][1] == len(data)
+    for (_, end), (start, _) in zip(ranges, ranges[1:]):
+        assert end == start and data[end - 1:end] == b"\n"
+
+    lines = [line for start, end in ranges for line in iter_lines(str(path), start, end)]
+    assert lines == LINES
+
+
+@pytest.mark.parametrize("content, lines", [
+    ("", []),
+    ("x = 1", ["x = 1"]),
+    ("x = 1\n", ["x = 1"]),
+    ("x = 1\r\n\ny = 2", ["x = 1\r", "", "y = 2"]),
+])
+def test_iter_lines(tmp_path, content: str, lines) -> None:
+    path = tmp_path / "corpus.txt"
+    path.write_bytes(content.encode())
+    assert list(iter_lines(str(path))) == lines
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_solve_file_matches_solve_many(tmp_path, workers: int) -> None:
+    path = tmp_path / "corpus.txt"
+    path.write_text("\n".join(LINES) + "\n")
+
+    results = list(solve_file(str(path), workers=workers, shard_size=100))
+    expected = solve_many(LINES)
+    assert len(results) == len(expected)
+    for result, solution in zip(results, expected):
+        if isinstance(solution, Exception):
+            assert type(result) is type(solution) and result.args == solution.args
+        else:
+            assert result == solution
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_solve_file_invalid_utf8(tmp_path, workers: int) -> None:
+    # Um byte inválido vira erro só da sua linha, e não interrompe o arquivo
+    path = tmp_path / "corpus.txt"
+    path.write_bytes(b"x = 1\n\xff\xfe = 2\n2x = 4\n")
+
+    results = list(solve_file(str(path), workers=workers, shard_size=4))
+    assert len(results) == 3
+    assert results[0] == Root(Variable("x"), Literal(1))
+    assert isinstance(results[1], ValueError) and "Invalid character" in str(results[1])
+    assert results[2] == Root(Variable("x"), Literal(2))
+
+
+def test_shard_ranges_invalid_size(tmp_path) -> None:
+    path = tmp_path / "corpus.txt"
+    path.write_text("x = 1\n")
+    with pytest.raises(ValueError, match="shard_size must be at least 1"):
+        shard_ranges(str(path), 0)
@@ -1,226 +1,157 @@
-import operator as op
-from typing import List, Union
-from nodes import Node, Root, Literal, Variable, BinaryOp
-from math import lcm
 from fractions import Fraction
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+import instrument
+from nodes import Node, Root, Literal, Variable, BinaryOp
+from linear import LinearForm, equation_form, linear_form
 
 
-def has_variable(node: Node) -> bool:
-    # verifica se node ou seus filhos contém variável
-    if isinstance(node, Variable):
-        return True
-    if isinstance(node, BinaryOp):
-        return has_variable(node.left) or has_variable(node.right)
-    return False
+# Versão das regras do solver: deve mudar sempre que uma mudança aqui (ou em
+# linear.py) puder mudar a resposta de alguma equação, o que invalida as respostas
+# guardadas em disco por cache.DiskCache
+VERSION = 2
 
+# Os percursos abaixo usam uma pilha explícita em vez de recursão, assim
+# árvores profundas (ou cadeias longas como 1 + 1 + ... + 1) não estouram
+# o limite de recursão do Python
 
-def has_literal(node: Node) -> bool:
-    # verifica se node ou seus filhos contém literal
-    if isinstance(node, Literal):
-        return True
-    if isinstance(node, BinaryOp):
-        return has_literal(node.left) or has_literal(node.right)
-    return False
 
+def has_variable(node: Node) -> bool:
+    # verifica se node ou seus filhos contém variável
+    return _any_node(node, lambda n: isinstance(n, Variable))
 
-def contains_fraction(node: Node) -> bool:
-    if isinstance(node, Root):
-        return contains_fraction(node.left) or contains_fraction(node.right)
 
-    if isinstance(node, BinaryOp):
-        if node.op == "/":
+def _any_node(node: Node, predicate: Callable[[Node], bool]) -> bool:
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if predicate(node):
             return True
-        return contains_fraction(node.left) or contains_fraction(node.right)
-
+        if isinstance(node, (Root, BinaryOp)):
+            stack.append(node.right)
+            stack.append(node.left)
     return False
 
 
-def solver(eq: Root) -> Root:
-    eq.left = solve_expr(eq.left)
-    eq.right = solve_expr(eq.right)
-
-    # ax = b -> x = b / a
-    if isinstance(eq.left, Variable) and isinstance(eq.right, Literal):
-        return Root(Variable(eq.left.name), Literal(eq.right.value / eq.left.coef))
-
-    # a = bx -> x = a / b:
-    if isinstance(eq.left, Literal) and isinstance(eq.right, Variable):
-        return Root(Variable(eq.right.name), Literal(eq.left.value / eq.right.coef))
-
-    # x/a = c/b + dx -> l = lcm(a,b): lx/a = l(c/b + dx)
-    # TODO: isso supostamente só deveria ser usado para divisão de x por um literal
-    # Ele resolve isso encontrando o lcm de todas os literais que dividem x (denominadores),
-    # multiplica left e right pelo lcm e aplica a distributiva para remover todas as frações de x por um literal
-    # Caso haja uma divisão de litereral por literal ela deve ser resolvida por solver
-    if contains_fraction(eq):
-        denominators: list[int] = []
-
-        def get_denominators(node: Node):
-            if isinstance(node, Root):
-                get_denominators(node.left)
-                get_denominators(node.right)
-
-            if isinstance(node, BinaryOp):
-                if node.op == "/" and isinstance(node.right, Literal):
-                    if isinstance(node.right.value, (float, Fraction)):
-                        raise NotImplementedError("fractions as denominators")
-                    denominators.append(node.right.value)
-                else:
-                    get_denominators(node.left)
-                    get_denominators(node.right)
-
-            return
-
-        get_denominators(eq)
-        l: int = lcm(*denominators)
-        # return solve(Root(distribute(eq.left, l), distribute(eq.right, l)))
-        return Root(distributive(eq.left, Literal(l)), distributive(eq.right, Literal(l)))
-
-    # ax + b = c + dx -> ax + (-dx) = c + (-b)
-    if has_variable(eq.right) or has_literal(eq.left):
-
-        def extract_terms(node: Node) -> List[Literal | Variable]:
-            if isinstance(node, BinaryOp):
-                return extract_terms(node.left) + extract_terms(node.right)
-
-            if isinstance(node, (Literal, Variable)):
-                return [node]
-
-            return []
-
-        left_terms: List[Literal | Variable] = extract_terms(eq.left)
-        right_terms: List[Literal | Variable] = extract_terms(eq.right)
-
-        def invert(node: Union[Literal, Variable]) -> Node:
-            if isinstance(node, Variable):
-                return Variable(name=node.name, coef=node.coef * -1)
-
-            return Literal(node.value * -1)
-
-        eq = Root(None, None)  # type: ignore
-
-        for term in left_terms:
-            if isinstance(term, Variable):
-                if eq.left:
-                    eq.left = BinaryOp("+", eq.left, term)
-                else:
-                    eq.left = term
-            else:
-                if eq.right:
-                    eq.right = BinaryOp("+", eq.right, invert(term))
-                else:
-                    eq.right = invert(term)
-
-        for term in right_terms:
-            if isinstance(term, Variable):
-                if eq.left:
-                    eq.left = BinaryOp("+", eq.left, invert(term))
-                else:
-                    eq.left = invert(term)
-            else:
-                if eq.right:
-                    eq.right = BinaryOp("+", eq.right, term)
-                else:
-                    eq.right = term
-
-        return solver(eq)
-
-    return eq
-
-
-def solve_expr(expr: Node) -> Node:
-    if isinstance(expr, (Literal, Variable)):
-        return expr
-
-    if isinstance(expr, BinaryOp):
-        left = solve_expr(expr.left)
-        right = solve_expr(expr.right)
-
-        # Apply Distributive
-        if expr.op == "*" and isinstance(expr.left, Literal) and isinstance(expr.right, BinaryOp):
-            return solve_expr(distributive(expr.right, expr.left))
-
-        if expr.op == "*" and isinstance(expr.left, BinaryOp) and isinstance(expr.right, Literal):
-            return solve_expr(distributive(expr.left, expr.right))
-
-        # Evaluate an operation with literal operands
-        if isinstance(left, Literal) and isinstance(right, Literal):
-            operations = {"+": op.add, "-": op.sub,
-                          "*": op.mul, "/": op.truediv}
-            return Literal(operations[expr.op](left.value, right.value))
-
-        # Combine like terms with the variable "x"
-        if isinstance(left, Variable) and isinstance(right, Variable):
-            return Variable(name=left.name, coef=left.coef + right.coef)
-
-        # Transforms a * x into ax
-        if expr.op == "*" and isinstance(left, Literal) and isinstance(right, Variable):
-            return Variable(name=right.name, coef=right.coef * left.value)
-
-        # Transforms x * a into ax
-        if expr.op == "*" and isinstance(left, Variable) and isinstance(right, Literal):
-            return Variable(name=left.name, coef=left.coef * right.value)
-
-        # ax / b -> (a/b)x
-        if expr.op == "/" and isinstance(left, Variable) and isinstance(right, Literal):
-            return Variable(name=left.name, coef=left.coef / right.value)
-
-        return BinaryOp(expr.op, left, right)
-
-    return expr
-
-
-def distributive(node: Node, multiplier: Literal) -> Node:
-    if isinstance(node, (Literal, Variable)):
-        return BinaryOp("*", multiplier, node)
-
-    if isinstance(node, BinaryOp):
-        if node.op == "+":
-            return BinaryOp(
-                "+",
-                distributive(node.left, multiplier),
-                distributive(node.right, multiplier),
-            )
-
-        if node.op == "-":
-            return BinaryOp(
-                "-",
-                distributive(node.left, multiplier),
-                distributive(node.right, multiplier),
-            )
-
-        if node.op == "/":
-            return BinaryOp("/", BinaryOp("*", multiplier, node.left), node.right)
-
-        if node.op == "*":
-            return BinaryOp("*", BinaryOp("*", multiplier, node.left), node.right)
-
-    return node
-
-
-# def distributive_div(node: Node, denominator: Literal) -> Node:
-#     if isinstance(node, (Literal, Variable)):
-#         return BinaryOp("/", node, denominator)
-
-#     if isinstance(node, BinaryOp):
-#         if node.op == "+":
-#             return BinaryOp(
-#                 "+",
-#                 distributive_div(node.left, denominator),
-#                 distributive_div(node.right, denominator),
-#             )
-
-#         if node.op == "-":
-#             return BinaryOp(
-#                 "-",
-#                 distributive_div(node.left, denominator),
-#                 distributive_div(node.right, denominator),
-#             )
-
-#         if node.op == "/":
-#             return BinaryOp("/", BinaryOp("/", node.left, denominator), node.right)
-
-#         if node.op == "*":
-#             return BinaryOp("*", BinaryOp("/", node.left, denominator), node.right)
-
-#     return node
+def solver(eq: Root, memo: Optional[Dict[int, Tuple[Node, LinearForm]]] = None) -> Root:
+    left, right, denominators = cross_multiply(eq.left, eq.right)
+
+    # ax + b = cx + d -> (a - c)x + (b - d) = 0 -> x = (d - b) / (a - c)
+    form = equation_form(Root(left, right), memo)
+    return solution(form, [linear_form(denominator, memo) for denominator in denominators])
+
+
+T = TypeVar("T")
+
+
+def move_denominators(
+    left: T,
+    right: T,
+    split: Callable[[T], Optional[Tuple[T, T]]],
+) -> Tuple[T, T, List[T], List[T]]:
+    # a / (bx + c) = d -> a = d(bx + c), para qualquer representação de árvore:
+    # split(nó) devolve (numerador, denominador) quando o nó é uma divisão por algo
+    # com variável. Todas as divisões do topo da esquerda vão para a direita; se não
+    # houver nenhuma, as do topo da direita vão para a esquerda.
+    # Devolve os lados sem essas divisões e os denominadores que multiplicam cada
+    # lado, na ordem em que foram movidos. Solver, compilador, FlatTree, Template
+    # e IncrementalEquation usam todos esta mesma regra
+    left_factors: List[T] = []
+    right_factors: List[T] = []
+
+    parts = split(left)
+    if parts is not None:
+        while parts is not None:
+            left, denominator = parts
+            right_factors.append(denominator)
+            parts = split(left)
+    else:
+        parts = split(right)
+        while parts is not None:
+            right, denominator = parts
+            left_factors.append(denominator)
+            parts = split(right)
+
+    return left, right, left_factors, right_factors
+
+
+def cross_multiply(left: Node, right: Node) -> Tuple[Node, Node, List[Node]]:
+    # Denominadores com variável são levados para o outro lado antes da forma linear;
+    # eles também são devolvidos, porque a solução não pode anular nenhum deles
+    left, right, left_factors, right_factors = move_denominators(left, right, _split)
+
+    stats = instrument.active
+    if stats is not None:
+        if right_factors:
+            stats.count("solver.cross_multiply_left", len(right_factors))
+        if left_factors:
+            stats.count("solver.cross_multiply_right", len(left_factors))
+
+    for factor in left_factors:
+        left = BinaryOp("*", left, factor)
+    for factor in right_factors:
+        right = BinaryOp("*", right, factor)
+    return left, right, left_factors + right_factors
+
+
+def _split(node: Node) -> Optional[Tuple[Node, Node]]:
+    if isinstance(node, BinaryOp) and node.op == "/" and has_variable(node.right):
+        return node.left, node.right
+    return None
+
+
+def solution(form: LinearForm, denominators: Sequence[LinearForm] = ()) -> Root:
+    # Resolve left - right = 0 já reduzida à forma linear. `denominators` são as
+    # formas dos denominadores que cross_multiply tirou da equação: a equação
+    # original não está definida onde algum deles se anula
+    stats = instrument.active
+    variables = form.variables()
+
+    if len(variables) == 0:
+        if form.const == 0:
+            excluded = _excluded(denominators)
+            if excluded is not None:
+                if stats is not None:
+                    stats.count("solver.identity")
+                if excluded:
+                    raise ValueError(f"Identity: every value is a solution except {', '.join(excluded)}")
+                raise ValueError("Identity: every value is a solution")
+        if stats is not None:
+            stats.count("solver.contradiction")
+        raise ValueError("Contradiction: the equation has no solution")
+
+    if len(variables) > 1:
+        if stats is not None:
+            stats.count("solver.multiple_variables")
+        raise ValueError(f"Expected exactly one variable, got {', '.join(sorted(variables))}")
+
+    name = variables[0]
+    # O denominador comum da forma se cancela; o único mdc da resolução é aqui
+    value = Fraction(-form.const, form.coefs[name])
+
+    for denominator in denominators:
+        if not any(coef for other, coef in denominator.coefs.items() if other != name):
+            if denominator.coef(name) * value + denominator.value() == 0:
+                if stats is not None:
+                    stats.count("solver.contradiction")
+                raise ValueError(
+                    f"Contradiction: the equation has no solution ({name} = {value} makes a denominator zero)"
+                )
+
+    if stats is not None:
+        stats.count("solver.solved")
+    return Root(Variable(name), Literal(value))
+
+
+def _excluded(denominators: Sequence[LinearForm]) -> Optional[List[str]]:
+    # Valores em que a identidade deixa de valer: as raízes dos denominadores de
+    # uma variável só. None quando algum denominador é zero para qualquer valor
+    excluded: Dict[str, None] = {}
+    for denominator in denominators:
+        variables = denominator.variables()
+        if not variables:
+            if denominator.const == 0:
+                return None
+        elif len(variables) == 1:
+            name = variables[0]
+            excluded[f"{name} = {Fraction(-denominator.const, denominator.coefs[name])}"] = None
+    return list(excluded)
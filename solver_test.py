@@ -1,6 +1,9 @@
+import re
 import pytest
 from nodes import Root, Literal, Variable, BinaryOp
 from solver import solver
+from lexer import lexer
+from parser import parser
 from fractions import Fraction
 
 # s = 5 -> s = 5
@@ -9,7 +12,7 @@ from fractions import Fraction
 # 10 = 2p -> p = 5
 # 5/10 + 3/2 = e/3 -> e = 6
 # (g - 2) / 3 = 4 -> g = 14
-# 2(j + 3) = 4j - 2 -> j = 2
+# 2(j + 3) = 4j - 2 -> j = 4
 # 2y = y + 3 -> y = 3
 # (1/2)b + (1/3)b = 5 -> b = 6
 # 1 = -w / (-2) -> w = 2
@@ -55,11 +58,11 @@ from fractions import Fraction
         Literal(4)
     ), Root(Variable("g"), Literal(14))),
 
-    # 2(j + 3) = 4j - 2 -> j = 2
+    # 2(j + 3) = 4j - 2 -> j = 4
     (Root(
         BinaryOp("*", Literal(2), BinaryOp("+", Variable("j"), Literal(3))),
         BinaryOp("-", BinaryOp("*", Literal(4), Variable("j")), Literal(2))
-    ), Root(Variable("j"), Literal(2))),
+    ), Root(Variable("j"), Literal(4))),
 
     # 2y = y + 3 -> y = 3
     (Root(
@@ -167,3 +170,83 @@ from fractions import Fraction
 ])
 def test_solver(eq: Root, solution: Root) -> None:
     assert solver(eq) == solution
+
+
+def test_solver_long_chain() -> None:
+    terms = 20000
+    node = Literal(1)
+    for _ in range(terms - 1):
+        node = BinaryOp("+", node, Literal(1))
+    assert solver(Root(Variable("x"), node)) == Root(Variable("x"), Literal(terms))
+
+
+def test_solver_deep_nesting() -> None:
+    depth = 20000
+    node = Literal(1)
+    for _ in range(depth):
+        node = BinaryOp("-", Literal(1), node)
+    assert solver(Root(Variable("x"), node)) == Root(Variable("x"), Literal(1))
+
+
+@pytest.mark.parametrize("eq, solution", [
+    # x - 2 = 3 -> x = 5
+    (Root(BinaryOp("-", Variable("x"), Literal(2)), Literal(3)), Root(Variable("x"), Literal(5))),
+    # 3 = 2 / (x - 1) -> x = 5/3
+    (Root(Literal(3), BinaryOp("/", Literal(2), BinaryOp("-", Variable("x"), Literal(1)))),
+     Root(Variable("x"), Literal(Fraction(5, 3)))),
+    # 4x - x = 6 -> x = 2
+    (Root(BinaryOp("-", Variable("x", 4), Variable("x")), Literal(6)), Root(Variable("x"), Literal(2))),
+])
+def test_solver_linear(eq: Root, solution: Root) -> None:
+    assert solver(eq) == solution
+
+
+@pytest.mark.parametrize("eq, error_msg", [
+    (Root(BinaryOp("+", Variable("x"), Literal(1)), BinaryOp("+", Literal(1), Variable("x"))),
+     "Identity: every value is a solution"),
+    (Root(BinaryOp("+", Variable("x"), Literal(1)), Variable("x")),
+     "Contradiction: the equation has no solution"),
+    (Root(BinaryOp("+", Variable("x", 2), Variable("y")), Literal(3)),
+     "Expected exactly one variable, got x, y"),
+    (Root(BinaryOp("*", Variable("x"), Variable("x")), Literal(4)),
+     "Non-linear equation: product of variables"),
+])
+def test_solver_invalid(eq: Root, error_msg: str) -> None:
+    with pytest.raises(ValueError, match=re.escape(error_msg)):
+        solver(eq)
+
+
+# Um denominador com variável é movido de lado, mas a equação original continua
+# indefinida onde ele se anula
+MOVED_DENOMINATORS = [
+    ("(x - 1) / (x - 1) = 2", "Contradiction: the equation has no solution (x = 1 makes a denominator zero)"),
+    ("(x - 1) / (2x - 2) = 1", "Contradiction: the equation has no solution (x = 1 makes a denominator zero)"),
+    ("2 = (x - 1) / (x - 1)", "Contradiction: the equation has no solution (x = 1 makes a denominator zero)"),
+    ("x / (x - x) = 1", "Contradiction: the equation has no solution"),
+    ("x / x = 1", "Identity: every value is a solution except x = 0"),
+    ("1 = (x + 2) / (x + 2)", "Identity: every value is a solution except x = -2"),
+]
+
+
+@pytest.mark.parametrize("text, error_msg", MOVED_DENOMINATORS)
+def test_solver_moved_denominator_zero(text: str, error_msg: str) -> None:
+    with pytest.raises(ValueError, match=re.escape(error_msg)):
+        solver(parser(lexer(text)))
+
+
+@pytest.mark.parametrize("text, value", [
+    ("x / (x - 2) = 2", 4),
+    ("(x - 1) / (x + 1) = 0", 1),
+    ("3 = 6 / (x - 1)", 3),
+])
+def test_solver_moved_denominator_nonzero(text: str, value) -> None:
+    assert solver(parser(lexer(text))) == Root(Variable("x"), Literal(value))
+
+
+def test_solver_memo() -> None:
+    shared = BinaryOp("/", BinaryOp("+", Variable("x"), Literal(3)), Literal(2))
+    memo: dict = {}
+
+    assert solver(Root(shared, Literal(2)), memo) == Root(Variable("x"), Literal(1))
+    assert id(shared) in memo
+    assert solver(Root(BinaryOp("-", shared, shared), Variable("x")), memo) == Root(Variable("x"), Literal(0))
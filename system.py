@@ -0,0 +1,192 @@
+from dataclasses import dataclass, field
+from enum import IntEnum
+from fractions import Fraction
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+from lexer import lexer
+from linear import equation_form
+from nodes import Root
+from parser import parser
+
+
+class Status(IntEnum):
+    UNIQUE = 0
+    INFINITE = 1
+    INCONSISTENT = 2
+
+
+@dataclass(frozen=True)
+class SystemSolution:
+    status: Status
+    # UNIQUE: valor de cada variável
+    # INFINITE: uma solução particular, com as variáveis livres valendo 0
+    # INCONSISTENT: vazio
+    # Com method="float" os valores de uma solução UNIQUE são floats
+    values: Dict[str, Union[Fraction, float]] = field(default_factory=dict)
+    free: Tuple[str, ...] = ()
+
+
+Row = Dict[int, Fraction]
+
+
+EXACT = "exact"
+FLOAT = "float"
+
+# Acima disso a solução em float64 perde dígitos demais e o caminho exato é usado
+MAX_CONDITION = 1e10
+
+
+def solve_system(
+    equations: Iterable[Union[str, Root]],
+    method: str = EXACT,
+    max_condition: float = MAX_CONDITION,
+) -> SystemSolution:
+    names, rows, rhs = build_matrix(equations)
+
+    if method == FLOAT:
+        solution = solve_float(names, rows, rhs, max_condition)
+        if solution is not None:
+            return solution
+    elif method != EXACT:
+        raise ValueError(f"Unknown method: {method}")
+
+    return eliminate(names, rows, rhs)
+
+
+def build_matrix(equations: Iterable[Union[str, Root]]) -> Tuple[List[str], List[Row], List[Fraction]]:
+    # Matriz esparsa: uma linha {coluna: coeficiente} por equação, só com os não nulos.
+    # Toda variável que aparece ganha uma coluna, mesmo quando seus coeficientes se
+    # cancelam (x - x): ela continua na resposta, como variável livre
+    columns: Dict[str, int] = {}
+    rows: List[Row] = []
+    rhs: List[Fraction] = []
+
+    for equation in equations:
+        eq = parser(lexer(equation)) if isinstance(equation, str) else equation
+        form = equation_form(eq)
+        row: Row = {}
+        for name, coef in form.coefs.items():
+            column = columns.setdefault(name, len(columns))
+            if coef != 0:
+                row[column] = Fraction(coef, form.den)
+        rows.append(row)
+        rhs.append(Fraction(-form.const, form.den))
+
+    names = sorted(columns, key=columns.__getitem__)
+    return names, rows, rhs
+
+
+def eliminate(names: List[str], rows: List[Row], rhs: List[Fraction]) -> SystemSolution:
+    # Eliminação gaussiana exata e esparsa seguida de substituição regressiva.
+    # O pivô segue a heurística de Markowitz: a linha ativa com menos entradas e,
+    # nela, a coluna que aparece em menos linhas, o que limita o preenchimento
+    # (fill-in). Só as linhas ainda ativas são eliminadas, então o fill-in não se
+    # espalha pelas linhas já usadas como pivô.
+    # `occurrences` é o índice coluna -> linhas, para achar quem eliminar sem varrer tudo
+    rows = [dict(row) for row in rows]
+    rhs = list(rhs)
+    occurrences: Dict[int, Set[int]] = {}
+    for i, row in enumerate(rows):
+        for column in row:
+            occurrences.setdefault(column, set()).add(i)
+
+    active = set(range(len(rows)))
+    pivots: Dict[int, int] = {}
+
+    while active:
+        r = min(active, key=lambda i: (len(rows[i]), i))
+        active.remove(r)
+        row = rows[r]
+
+        if not row:
+            if rhs[r] != 0:
+                return SystemSolution(Status.INCONSISTENT)
+            continue
+
+        column = min(row, key=lambda c: (len(occurrences[c]), c))
+        pivot = row[column]
+        if pivot != 1:
+            for c in row:
+                row[c] /= pivot
+            rhs[r] /= pivot
+
+        for s in list(occurrences[column]):
+            if s not in active:
+                continue
+            target = rows[s]
+            factor = target[column]
+            for c, value in row.items():
+                updated = target.get(c, 0) - factor * value
+                if updated == 0:
+                    if c in target:
+                        del target[c]
+                        occurrences[c].discard(s)
+                else:
+                    if c not in target:
+                        occurrences[c].add(s)
+                    target[c] = updated
+            rhs[s] -= factor * rhs[r]
+
+        pivots[column] = r
+
+    # Cada linha pivô só contém colunas pivotadas depois dela (ou livres, que valem 0)
+    solved: Dict[int, Fraction] = {}
+    for column, r in reversed(pivots.items()):
+        value = rhs[r]
+        for c, coef in rows[r].items():
+            if c != column and c in solved:
+                value -= coef * solved[c]
+        solved[column] = value
+
+    values: Dict[str, Fraction] = {}
+    free: List[str] = []
+    for column, name in enumerate(names):
+        if column in solved:
+            values[name] = Fraction(solved[column])
+        else:
+            values[name] = Fraction(0)
+            free.append(name)
+
+    if free:
+        return SystemSolution(Status.INFINITE, values, tuple(free))
+    return SystemSolution(Status.UNIQUE, values)
+
+
+def solve_float(
+    names: List[str],
+    rows: List[Row],
+    rhs: List[Fraction],
+    max_condition: float = MAX_CONDITION,
+) -> Optional[SystemSolution]:
+    # Caminho numérico via LAPACK. Só responde quando a solução é única e confiável:
+    # matriz quadrada, bem condicionada e com resíduo pequeno. Nos outros casos
+    # devolve None e quem chama usa a eliminação exata.
+    # O numpy só é importado aqui: quem usa apenas o caminho exato não paga o import
+    try:
+        import numpy as np
+    except ImportError:
+        raise ImportError("method='float' requires numpy") from None
+
+    size = len(names)
+    if size == 0 or len(rows) != size:
+        return None
+
+    matrix = np.zeros((size, size))
+    for i, row in enumerate(rows):
+        for column, coef in row.items():
+            matrix[i, column] = coef
+    vector = np.array([float(value) for value in rhs])
+
+    if not np.isfinite(matrix).all() or not np.isfinite(vector).all():
+        return None
+
+    condition = np.linalg.cond(matrix)
+    if not condition < max_condition:
+        return None
+
+    solution = np.linalg.solve(matrix, vector)
+    residual = np.linalg.norm(matrix @ solution - vector)
+    scale = np.linalg.norm(matrix) * np.linalg.norm(solution) + np.linalg.norm(vector)
+    if not residual <= condition * np.finfo(float).eps * max(scale, 1.0) * size:
+        return None
+
+    return SystemSolution(Status.UNIQUE, {name: float(value) for name, value in zip(names, solution)})
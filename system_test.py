@@ -0,0 +1,142 @@
+import random
+import subprocess
+import sys
+import pytest
+from fractions import Fraction
+from typing import List
+from linear import equation_form
+from nodes import Root, Literal, Variable, BinaryOp
+from system import Status, SystemSolution, solve_system
+
+
+@pytest.mark.parametrize("equations, solution", [
+    (["2x + y = 3", "x - y = 0"],
+     SystemSolution(Status.UNIQUE, {"x": Fraction(1), "y": Fraction(1)})),
+    (["x + y + z = 6", "2y + 5z = -4", "2x + 5y - z = 27"],
+     SystemSolution(Status.UNIQUE, {"x": Fraction(5), "y": Fraction(3), "z": Fraction(-2)})),
+    (["a / 2 + b / 3 = 1", "a - b = 1/2"],
+     SystemSolution(Status.UNIQUE, {"a": Fraction(7, 5), "b": Fraction(9, 10)})),
+    (["3k = 12"],
+     SystemSolution(Status.UNIQUE, {"k": Fraction(4)})),
+    # Equações redundantes não atrapalham
+    (["x + y = 2", "2x + 2y = 4", "x - y = 0"],
+     SystemSolution(Status.UNIQUE, {"x": Fraction(1), "y": Fraction(1)})),
+    (["x + y = 2", "2x + 2y = 4"],
+     SystemSolution(Status.INFINITE, {"x": Fraction(2), "y": Fraction(0)}, ("y",))),
+    (["x + y + z = 1", "x - y = 0"],
+     SystemSolution(Status.INFINITE, {"x": Fraction(0), "y": Fraction(0), "z": Fraction(1)}, ("y",))),
+    # Coeficientes que se cancelam não tiram a variável do sistema: ela fica livre
+    (["x - x = 0"],
+     SystemSolution(Status.INFINITE, {"x": Fraction(0)}, ("x",))),
+    (["x + y - y = 1"],
+     SystemSolution(Status.INFINITE, {"x": Fraction(1), "y": Fraction(0)}, ("y",))),
+    (["x + y = 2", "x + y = 3"],
+     SystemSolution(Status.INCONSISTENT)),
+    (["x = 1", "1 = 2"],
+     SystemSolution(Status.INCONSISTENT)),
+])
+def test_solve_system(equations: List[str], solution: SystemSolution) -> None:
+    assert solve_system(equations) == solution
+
+
+def test_solve_system_infinite_solution_satisfies_equations() -> None:
+    equations = ["x + 2y - z = 4", "2x + 4y - 2z = 8", "y + z = 1"]
+    solution = solve_system(equations)
+    assert solution.status == Status.INFINITE
+    x, y, z = (solution.values[name] for name in "xyz")
+    assert x + 2 * y - z == 4
+    assert y + z == 1
+
+
+def test_solve_system_accepts_roots() -> None:
+    eq = Root(BinaryOp("+", Variable("x", 2), Variable("y")), Literal(3))
+    assert solve_system([eq, "x = 1"]).values == {"x": 1, "y": 1}
+
+
+def test_solve_system_nonlinear() -> None:
+    with pytest.raises(ValueError, match="Non-linear"):
+        solve_system(["x * y = 1", "x = 1"])
+
+
+def test_solve_system_large_sparse_chain() -> None:
+    # v0 = 1, v(i) - v(i-1) = 1/2 para 500 variáveis
+    size = 500
+    equations = [Root(Variable("v0"), Literal(1))]
+    for i in range(1, size):
+        equations.append(Root(BinaryOp("-", Variable(f"v{i}"), Variable(f"v{i - 1}")), Literal(Fraction(1, 2))))
+
+    solution = solve_system(reversed(equations))
+    assert solution.status == Status.UNIQUE
+    assert solution.values == {f"v{i}": 1 + Fraction(i, 2) for i in range(size)}
+
+
+def test_solve_system_random_sparse() -> None:
+    random.seed(12)
+    size = 120
+    equations = []
+    for i in range(size):
+        node = Variable(f"v{i}", random.randint(1, 5))
+        for j in random.sample(range(size), 3):
+            node = BinaryOp("+", node, Variable(f"v{j}", random.randint(-3, 3)))
+        equations.append(Root(node, Literal(random.randint(-9, 9))))
+
+    solution = solve_system(equations)
+    assert solution.status == Status.UNIQUE
+    for eq in equations:
+        form = equation_form(eq)
+        assert sum(coef * solution.values[name] for name, coef in form.coefs.items()) + form.const == 0
+
+
+@pytest.mark.parametrize("equations", [
+    ["2x + y = 3", "x - y = 0"],
+    ["x + y + z = 6", "2y + 5z = -4", "2x + 5y - z = 27"],
+    ["a / 2 + b / 3 = 1", "a - b = 1/2"],
+])
+def test_solve_system_float(equations: List[str]) -> None:
+    pytest.importorskip("numpy")
+    exact = solve_system(equations)
+    numeric = solve_system(equations, method="float")
+
+    assert numeric.status == Status.UNIQUE
+    assert all(isinstance(value, float) for value in numeric.values.values())
+    assert numeric.values == pytest.approx({name: float(value) for name, value in exact.values.items()})
+
+
+@pytest.mark.parametrize("equations, status", [
+    (["x + y = 2", "2x + 2y = 4"], Status.INFINITE),
+    (["x + y = 2", "x + y = 3"], Status.INCONSISTENT),
+    (["x + y + z = 1", "x - y = 0"], Status.INFINITE),
+    (["x + y - y = 1"], Status.INFINITE),
+])
+def test_solve_system_float_falls_back_to_exact(equations: List[str], status: Status) -> None:
+    pytest.importorskip("numpy")
+    assert solve_system(equations, method="float") == solve_system(equations)
+    assert solve_system(equations, method="float").status == status
+
+
+def test_solve_system_float_ill_conditioned() -> None:
+    pytest.importorskip("numpy")
+    # Matriz de Hilbert 12x12: cond ~ 1e16, o resultado em float não é confiável
+    size = 12
+    equations = []
+    for i in range(size):
+        node = Variable(f"v{0}", Fraction(1, i + 1))
+        for j in range(1, size):
+            node = BinaryOp("+", node, Variable(f"v{j}", Fraction(1, i + j + 1)))
+        equations.append(Root(node, Literal(1)))
+
+    solution = solve_system(equations, method="float")
+    assert solution == solve_system(equations)
+    assert all(isinstance(value, Fraction) for value in solution.values.values())
+
+
+def test_solve_system_unknown_method() -> None:
+    with pytest.raises(ValueError, match="Unknown method: fast"):
+        solve_system(["x = 1"], method="fast")
+
+
+def test_import_does_not_load_numpy() -> None:
+    # O caminho exato não depende do numpy, então importar system não o carrega
+    code = "import sys, system; system.solve_system(['x = 1']); print('numpy' in sys.modules)"
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert output.stdout.strip() == "False"
@@ -0,0 +1,206 @@
+from array import array
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+from lexer import lexer
+from nodes import Node, Root, Literal, Variable, BinaryOp
+from parser import parser
+from solver import move_denominators
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Uma equação com parâmetros nomeados (a*x + b = c) compilada uma única vez para
+# resolver muitas linhas de valores de uma vez. Cada nó vira uma closure que recebe
+# os valores dos parâmetros (arrays NumPy ou escalares) e devolve o par
+# (coef, const) da sua forma linear na incógnita
+
+Pair = Tuple[object, object]
+Compiled = Callable[[Dict[str, object]], Pair]
+
+
+class Template:
+    def __init__(self, eq: Union[str, Root], unknown: str = "x"):
+        if isinstance(eq, str):
+            eq = parser(lexer(eq))
+
+        self.unknown = unknown
+        left, right = eq.left, eq.right
+
+        # a / (bx + c) = d -> a = d(bx + c), com a mesma regra de solver.solver
+        left, right, left_factors, right_factors = move_denominators(left, right, self._split)
+        for factor in left_factors:
+            left = BinaryOp("*", left, factor)
+        for factor in right_factors:
+            right = BinaryOp("*", right, factor)
+
+        if not (self._has_unknown(left) or self._has_unknown(right)):
+            raise ValueError(f"The unknown '{unknown}' does not appear in the equation")
+
+        names: Dict[str, None] = {}
+        self._left = self._compile(left, names)
+        self._right = self._compile(right, names)
+        # Os denominadores movidos: uma linha cuja solução anula algum deles não tem solução
+        self._denominators = [self._compile(factor, names) for factor in left_factors + right_factors]
+        self.parameters: Tuple[str, ...] = tuple(sorted(names))
+
+    def __call__(self, **values: Sequence[float]):
+        missing = set(self.parameters) - set(values)
+        if missing:
+            raise ValueError(f"Missing parameters: {', '.join(sorted(missing))}")
+
+        if np is not None and not any(isinstance(v, array) for v in values.values()):
+            return self._solve_numpy(values)
+        return self._solve_rows(values)
+
+    def _solve_numpy(self, values: Dict[str, Sequence[float]]):
+        env = {name: np.asarray(values[name], dtype=np.float64) for name in self.parameters}
+
+        # Divisões por zero em uma linha não interrompem as outras: viram inf/NaN
+        with np.errstate(all="ignore"):
+            a, b = self._left(env)  # type: ignore
+            c, d = self._right(env)  # type: ignore
+            coef, const = np.broadcast_arrays(np.asarray(a - c, dtype=np.float64),
+                                              np.asarray(d - b, dtype=np.float64))
+            result = np.array(const / coef)
+
+            # Linhas sem solução única (coeficiente nulo) viram NaN
+            result[coef == 0] = np.nan
+            for denominator in self._denominators:
+                p, q = denominator(env)  # type: ignore
+                result[np.broadcast_to(np.asarray(p * result + q) == 0, result.shape)] = np.nan
+        return result
+
+    def _solve_rows(self, values: Dict[str, Sequence[float]]) -> array:
+        # Sem NumPy (ou com array.array de entrada): as mesmas closures, linha a linha
+        columns = [values[name] for name in self.parameters]
+        sizes = {len(column) for column in columns}
+        if len(sizes) > 1:
+            raise ValueError("All parameter arrays must have the same length")
+        size = sizes.pop() if sizes else 1
+
+        result = array("d")
+        for i in range(size):
+            env = {name: float(column[i]) for name, column in zip(self.parameters, columns)}
+            try:
+                a, b = self._left(env)  # type: ignore
+                c, d = self._right(env)  # type: ignore
+                value = (d - b) / (a - c)  # type: ignore
+                for denominator in self._denominators:
+                    p, q = denominator(env)  # type: ignore
+                    if p * value + q == 0:  # type: ignore
+                        value = float("nan")
+                result.append(value)
+            except ZeroDivisionError:
+                result.append(float("nan"))
+        return result
+
+    def _split(self, node: Node) -> Optional[Tuple[Node, Node]]:
+        if isinstance(node, BinaryOp) and node.op == "/" and self._has_unknown(node.right):
+            return node.left, node.right
+        return None
+
+    def _has_unknown(self, node: Node) -> bool:
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, Variable) and node.name == self.unknown:
+                return True
+            if isinstance(node, BinaryOp):
+                stack.append(node.left)
+                stack.append(node.right)
+        return False
+
+    def _compile(self, node: Node, names: Dict[str, None]) -> Compiled:
+        # Pós-ordem com pilha explícita; junto de cada closure vai a informação
+        # estática de a subárvore conter ou não a incógnita
+        results: List[Tuple[Compiled, bool]] = []
+        stack: List[Tuple[Node, bool]] = [(node, False)]
+
+        while stack:
+            node, visited = stack.pop()
+
+            if isinstance(node, Literal):
+                results.append((_constant(float(node.value)), False))
+            elif isinstance(node, Variable):
+                if node.name == self.unknown:
+                    results.append((_constant_coef(float(node.coef)), True))
+                else:
+                    names[node.name] = None
+                    results.append((_parameter(node.name, float(node.coef)), False))
+            elif not isinstance(node, BinaryOp):
+                raise ValueError(f"Unexpected node: {node!r}")
+            elif not visited:
+                stack.append((node, True))
+                stack.append((node.right, False))
+                stack.append((node.left, False))
+            else:
+                right, right_unknown = results.pop()
+                left, left_unknown = results.pop()
+                if node.op == "*" and left_unknown and right_unknown:
+                    raise ValueError("Non-linear equation: product of variables")
+                if node.op == "/" and right_unknown:
+                    raise ValueError("Non-linear equation: variable in a denominator")
+                results.append((_OPERATORS[node.op](left, right), left_unknown or right_unknown))
+
+        return results[0][0]
+
+
+def compile_template(eq: Union[str, Root], unknown: str = "x") -> Template:
+    return Template(eq, unknown)
+
+
+def _constant(value: float) -> Compiled:
+    return lambda env: (0.0, value)
+
+
+def _constant_coef(coef: float) -> Compiled:
+    return lambda env: (coef, 0.0)
+
+
+def _parameter(name: str, coef: float) -> Compiled:
+    if coef == 1:
+        return lambda env: (0.0, env[name])
+    return lambda env: (0.0, coef * env[name])  # type: ignore
+
+
+def _add(left: Compiled, right: Compiled) -> Compiled:
+    def add(env: Dict[str, object]) -> Pair:
+        a, b = left(env)
+        c, d = right(env)
+        return a + c, b + d  # type: ignore
+    return add
+
+
+def _sub(left: Compiled, right: Compiled) -> Compiled:
+    def sub(env: Dict[str, object]) -> Pair:
+        a, b = left(env)
+        c, d = right(env)
+        return a - c, b - d  # type: ignore
+    return sub
+
+
+def _mul(left: Compiled, right: Compiled) -> Compiled:
+    # Um dos lados nunca tem a incógnita (verificado na compilação)
+    def mul(env: Dict[str, object]) -> Pair:
+        a, b = left(env)
+        c, d = right(env)
+        return a * d + c * b, b * d  # type: ignore
+    return mul
+
+
+def _div(left: Compiled, right: Compiled) -> Compiled:
+    def div(env: Dict[str, object]) -> Pair:
+        a, b = left(env)
+        _, d = right(env)
+        return a / d, b / d  # type: ignore
+    return div
+
+
+_OPERATORS: Dict[str, Callable[[Compiled, Compiled], Compiled]] = {
+    "+": _add,
+    "-": _sub,
+    "*": _mul,
+    "/": _div,
+}
@@ -0,0 +1,82 @@
+import math
+import re
+import pytest
+from array import array
+from fractions import Fraction
+from typing import Dict, List
+from lexer import lexer
+from parser import parser
+from solver import solver
+from template import compile_template
+
+
+@pytest.mark.parametrize("text, parameters, rows", [
+    ("a*x + b = c", ("a", "b", "c"), [{"a": 2, "b": 1, "c": 5}, {"a": -4, "b": 0.5, "c": 2.5}]),
+    ("(x - p) / 3 = q", ("p", "q"), [{"p": 1, "q": 2}, {"p": -3, "q": 0}]),
+    ("2 * (x + k) = 4x - m", ("k", "m"), [{"k": 3, "m": 2}, {"k": 0, "m": 1}]),
+    ("p / x = q", ("p", "q"), [{"p": 2, "q": 4}, {"p": 3, "q": 6}]),
+])
+def test_template_rows(text: str, parameters: tuple, rows: List[Dict[str, float]]) -> None:
+    template = compile_template(text)
+    assert template.parameters == parameters
+
+    columns = {name: array("d", [row[name] for row in rows]) for name in parameters}
+    result = template(**columns)
+    assert isinstance(result, array)
+
+    for row, value in zip(rows, result):
+        substituted = text
+        for name, number in row.items():
+            substituted = substituted.replace(name, f"({Fraction(number)})")
+        expected = solver(parser(lexer(substituted))).right.value
+        assert value == pytest.approx(float(expected))
+
+
+def test_template_rows_without_solution() -> None:
+    template = compile_template("a*x + b = c")
+    result = template(a=array("d", [0, 2]), b=array("d", [1, 1]), c=array("d", [1, 5]))
+    assert math.isnan(result[0])
+    assert result[1] == 2
+
+
+def test_template_rows_moved_denominator_zero() -> None:
+    # p / (x - 1) = q -> x = p/q + 1; com p = 0 a solução anularia o denominador
+    template = compile_template("p / (x - 1) = q")
+    result = template(p=array("d", [0, 2]), q=array("d", [2, 1]))
+    assert math.isnan(result[0]) and result[1] == 3
+
+
+def test_template_numpy_moved_denominator_zero() -> None:
+    np = pytest.importorskip("numpy")
+    template = compile_template("p / (x - 1) = q")
+    result = template(p=np.array([0.0, 2.0]), q=np.array([2.0, 1.0]))
+    assert np.isnan(result[0]) and result[1] == 3
+
+
+def test_template_numpy() -> None:
+    np = pytest.importorskip("numpy")
+    template = compile_template("a*x + b = c")
+    rng = np.random.default_rng(0)
+    a, b, c = rng.random(1000) + 1, rng.random(1000), rng.random(1000)
+
+    result = template(a=a, b=b, c=c)
+    assert result.shape == (1000,)
+    assert np.allclose(result, (c - b) / a)
+
+    result = template(a=[0, 2], b=[1, 1], c=[1, 5])
+    assert np.isnan(result[0]) and result[1] == 2
+
+
+@pytest.mark.parametrize("text, unknown, error_msg", [
+    ("a*x*x = 1", "x", "Non-linear equation: product of variables"),
+    ("a / (x + 1 / x) = 1", "x", "Non-linear equation: variable in a denominator"),
+    ("a + b = c", "x", "The unknown 'x' does not appear in the equation"),
+])
+def test_template_invalid(text: str, unknown: str, error_msg: str) -> None:
+    with pytest.raises(ValueError, match=re.escape(error_msg)):
+        compile_template(text, unknown)
+
+
+def test_template_missing_parameters() -> None:
+    with pytest.raises(ValueError, match="Missing parameters: b, c"):
+        compile_template("a*x + b = c")(a=[1])